@@ -0,0 +1,90 @@
+"""Temps de sérialisation du fil GET /bookings/user pour 1 000 réservations.
+
+    python -m benchmarks.booking_feed_serialization --rows 1000 --repeat 50
+
+Compare l'ancien chemin (dicts imbriqués + jsonable_encoder + JSONResponse) au
+chemin actuel (projection de colonnes + ORJSONResponse).
+"""
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from types import SimpleNamespace
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+
+from routes.booking import _feed_item  # noqa: E402
+
+
+def make_rows(count):
+    start = datetime(2025, 1, 6, 8, 0)
+    rows = []
+    for i in range(count):
+        booking = SimpleNamespace(
+            id=i, user_id=1, car_id=i % 20,
+            start_time=start + timedelta(hours=i), end_time=start + timedelta(hours=i, minutes=45),
+            purpose="accompanied", status="confirmée", created_at=start, updated_at=start,
+        )
+        car = SimpleNamespace(
+            id=i % 20, nom="Clio", modele="V", annee_fab=2021, type="double commande",
+            plaque=f"AB-{i % 20:03d}-CD", controle_technique=date(2024, 5, 1),
+            prix_par_heure=Decimal("20.00"), disponible=True, image_url=None,
+        )
+        # Même forme que les lignes SQLAlchemy : (Booking, Car) pour l'ancien chemin, colonnes à plat pour le nouveau
+        flat = SimpleNamespace(
+            **vars(booking),
+            **{f"car_{key}": value for key, value in vars(car).items() if key != "id"},
+        )
+        rows.append((SimpleNamespace(Booking=booking, Car=car), flat))
+    return rows
+
+
+def legacy(rows):
+    bookings_list = [
+        {
+            **{key: getattr(row.Booking, key) for key in (
+                "id", "user_id", "car_id", "start_time", "end_time", "purpose", "status", "created_at", "updated_at",
+            )},
+            "car": {key: getattr(row.Car, key) for key in (
+                "id", "nom", "modele", "annee_fab", "type", "plaque", "controle_technique",
+                "prix_par_heure", "disponible", "image_url",
+            )},
+        }
+        for row, _ in rows
+    ]
+    return JSONResponse(jsonable_encoder(bookings_list)).body
+
+
+def current(rows):
+    return ORJSONResponse([_feed_item(flat) for _, flat in rows]).body
+
+
+def measure(func, rows, repeat):
+    func(rows)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(rows)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    legacy_ms = measure(legacy, rows, args.repeat)
+    current_ms = measure(current, rows, args.repeat)
+    print(json.dumps({
+        "rows": args.rows,
+        "legacy_ms": round(legacy_ms, 3),
+        "orjson_ms": round(current_ms, 3),
+        "speedup": round(legacy_ms / current_ms, 1),
+    }, indent=2))
@@ -0,0 +1,106 @@
+"""Débit de GET /cars/ selon le mode de journalisation.
+
+    python -m benchmarks.logging_throughput --requests 2000 --concurrency 20
+
+Compare la file de logs (écriture dans un thread dédié) aux handlers fichier et
+console appelés directement dans la boucle asyncio, comme avant. Affiche en JSON
+les requêtes/s et les p50/p99 de chaque mode.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+# On mesure l'API, pas la limitation de débit (un client unique dépasserait vite les seuils par défaut)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from benchmarks.stats import percentile  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models.car import Car  # noqa: E402
+from utils.logger import JsonFormatter, SizeAndTimeRotatingFileHandler, shutdown_logging  # noqa: E402
+
+
+async def seed(cars):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        session.add_all(
+            Car(
+                nom="Bench",
+                modele=f"M{i}",
+                annee_fab=2020,
+                type="classique",
+                plaque=f"BN-{i:03d}-CH",
+                controle_technique=date.today(),
+                prix_par_heure=20,
+            )
+            for i in range(cars)
+        )
+        await session.commit()
+
+
+def install_blocking_handlers(directory):
+    """Handlers synchrones sur le logger racine : chaque log écrit dans la boucle."""
+    file_handler = SizeAndTimeRotatingFileHandler(
+        os.path.join(directory, "blocking.log"), maxBytes=5_000_000, backupCount=1, interval=86400
+    )
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(open(os.devnull, "w"))
+    logging.getLogger().handlers = [file_handler, console_handler]
+
+
+async def run(client, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def call():
+        async with semaphore:
+            start = time.perf_counter()
+            await client.get("/cars/", headers={"Cache-Control": "no-cache"})
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def main(requests, concurrency, cars):
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # Logs du client de bench
+    await seed(cars)
+    transport = httpx.ASGITransport(app=app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await run(client, 50, concurrency)  # Préchauffage (cache, pool)
+        results["queue"] = await run(client, requests, concurrency)
+
+        shutdown_logging()
+        with tempfile.TemporaryDirectory() as directory:
+            install_blocking_handlers(directory)
+            results["blocking"] = await run(client, requests, concurrency)
+            for handler in logging.getLogger().handlers:
+                handler.close()
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--cars", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.cars))
@@ -0,0 +1,105 @@
+"""Latence de GET /cars/ pendant une rafale de connexions (bcrypt).
+
+    python -m benchmarks.login_storm --logins 200 --concurrency 50
+
+Affiche en JSON les p50/p99 de /cars/ au repos puis pendant la rafale : avec le
+hachage hors boucle asyncio, les deux doivent rester proches.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark")
+# On mesure l'API, pas la limitation de débit (un client unique dépasserait vite les seuils par défaut)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import httpx  # noqa: E402
+
+from benchmarks.stats import percentile  # noqa: E402
+from database import Base, SessionLocal, engine  # noqa: E402
+from main import app  # noqa: E402
+from models.user import User  # noqa: E402
+
+EMAIL = "storm@example.com"
+PASSWORD = "benchmark-password"
+
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        session.add(User(
+            nom="Storm",
+            prenom="Test",
+            email=EMAIL,
+            password=User.hash_password(PASSWORD),
+            telephone="0600000000",
+            adresse="1 rue du Test",
+            date_naissance=date(1990, 1, 1),
+            role="apprenti",
+            numero_livret="STORM-1",
+        ))
+        await session.commit()
+
+
+async def probe_cars(client, duration):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/cars/")
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def login_storm(client, logins, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = []
+
+    async def login():
+        async with semaphore:
+            response = await client.post("/auth/login", data={"username": EMAIL, "password": PASSWORD})
+            statuses.append(response.status_code)
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return statuses
+
+
+def summary(latencies):
+    return {
+        "requests": len(latencies),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+    }
+
+
+async def main(logins, concurrency, idle_seconds):
+    await seed()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle = await probe_cars(client, idle_seconds)
+
+        storm = asyncio.create_task(login_storm(client, logins, concurrency))
+        under_load = []
+        while not storm.done():
+            under_load.extend(await probe_cars(client, 0.2))
+        statuses = await storm
+
+    print(json.dumps({
+        "cars_idle": summary(idle),
+        "cars_during_login_storm": summary(under_load),
+        "logins": {str(code): statuses.count(code) for code in sorted(set(statuses))},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency, args.idle_seconds))
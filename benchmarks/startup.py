@@ -0,0 +1,74 @@
+"""Temps de démarrage d'un worker : import de l'application, lifespan, première requête.
+
+    python -m benchmarks.startup --runs 10
+
+Chaque mesure se fait dans un processus Python neuf (imports à froid). Affiche
+en JSON la médiane et le maximum de chaque étape, en millisecondes.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Exécuté dans le processus enfant
+PROBE = """
+import asyncio, json, time
+start = time.perf_counter()
+import httpx
+from main import app
+imported = time.perf_counter()
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/cars/")
+            response.raise_for_status()
+        return ready, time.perf_counter()
+
+ready, first_response = asyncio.run(boot())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "lifespan_ms": (ready - imported) * 1000,
+    "first_request_ms": (first_response - ready) * 1000,
+    "total_ms": (first_response - start) * 1000,
+}))
+"""
+
+
+def measure(env):
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(runs, create_schema):
+    env = {
+        **os.environ,
+        "DATABASE_URL": os.environ.get("DATABASE_URL", "sqlite+aiosqlite:///:memory:"),
+        "JWT_SECRET_KEY": os.environ.get("JWT_SECRET_KEY", "benchmark"),
+        "DB_CREATE_SCHEMA": str(create_schema).lower(),
+        "BOOKING_LIFECYCLE_IN_APP": "false",
+    }
+    samples = [measure(env) for _ in range(runs)]
+    print(json.dumps({
+        step: {
+            "median": round(statistics.median(sample[step] for sample in samples), 1),
+            "max": round(max(sample[step] for sample in samples), 1),
+        }
+        for step in samples[0]
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument(
+        "--skip-schema", action="store_true", help="DB_CREATE_SCHEMA=false (base déjà migrée, DATABASE_URL requis)"
+    )
+    args = parser.parse_args()
+    main(args.runs, not args.skip_schema)
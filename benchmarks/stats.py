@@ -0,0 +1,7 @@
+"""Outils partagés par les scripts de benchmarks."""
+import statistics
+
+
+def percentile(samples, q):
+    """Centile `q` (1-99) d'une liste de mesures non vide."""
+    return statistics.quantiles(samples, n=100)[q - 1] if len(samples) > 1 else samples[0]
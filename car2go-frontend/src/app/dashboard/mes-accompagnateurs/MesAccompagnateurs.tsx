@@ -32,7 +32,7 @@ export default function MesAccompagnateurs() {
     const fetchAccompagnateurs = async () => {
       try {
         const response = await fetch(
-          `${process.env.NEXT_PUBLIC_API_URL}/apprenti_accompagnateur/${user.id}`,
+          `${process.env.NEXT_PUBLIC_API_URL}/service/apprenti/${user.id}`,
           {
             headers: {
               Authorization: `Bearer ${token}`,
@@ -59,7 +59,7 @@ export default function MesAccompagnateurs() {
 
     try {
       const response = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL}/apprenti_accompagnateur/${id}`,
+        `${process.env.NEXT_PUBLIC_API_URL}/service/${id}`,
         {
           method: "DELETE",
           headers: {
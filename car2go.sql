@@ -1,3 +1,5 @@
+CREATE EXTENSION IF NOT EXISTS btree_gist;
+
 CREATE TABLE users (
     id SERIAL PRIMARY KEY,
     nom CHARACTER VARYING(100) NOT NULL,
@@ -40,5 +42,29 @@ CREATE TABLE bookings (
     status CHARACTER VARYING(20) DEFAULT 'pending',
     purpose CHARACTER VARYING(20) NOT NULL CHECK (purpose IN ('self', 'accompanied')),
     created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW()
-);
\ No newline at end of file
+    updated_at TIMESTAMP DEFAULT NOW(),
+    CONSTRAINT bookings_no_overlap EXCLUDE USING gist (car_id WITH =, tsrange(start_time, end_time) WITH &&) WHERE (status = 'confirmée')
+);
+
+CREATE TABLE bookings_history (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    car_id INTEGER NOT NULL,
+    start_time TIMESTAMP NOT NULL,
+    end_time TIMESTAMP NOT NULL,
+    status CHARACTER VARYING(20) NOT NULL,
+    purpose CHARACTER VARYING(20) NOT NULL,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX ix_bookings_active_car_period ON bookings (car_id, start_time, end_time) WHERE status = 'confirmée';
+CREATE INDEX ix_bookings_history_user_id ON bookings_history (user_id);
+CREATE INDEX ix_bookings_history_car_id ON bookings_history (car_id);
+CREATE INDEX ix_bookings_user_start ON bookings (user_id, start_time);
+CREATE INDEX ix_bookings_status_id ON bookings (status, id);
+CREATE INDEX ix_bookings_car_id ON bookings (car_id, id);
+CREATE INDEX ix_bookings_end_start ON bookings (end_time, start_time);
+CREATE INDEX ix_cars_type_id ON cars (type, id);
+CREATE INDEX ix_users_role_id ON users (role, id);
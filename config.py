@@ -1,11 +1,72 @@
-from typing import List
+from typing import List, Optional
 from pydantic import BaseSettings, validator
 
 class Settings(BaseSettings):
     database_url: str
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
+    # Moteur SQLAlchemy : pool de connexions par worker uvicorn
+    db_echo: bool = False
+    # create_all au démarrage (dev, tests) ; à désactiver quand le schéma est géré par Alembic
+    db_create_schema: bool = True
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_timeout_ms: Optional[int] = None
     cors_origins: List[str] = ["*"]
+    # Cache jeton -> utilisateur de get_current_user
+    token_cache_ttl_seconds: int = 300
+    token_cache_max_entries: int = 10000
+    # Embarque id/role/nom/prenom dans le JWT : aucune requête SQL pour authentifier,
+    # mais les changements de rôle ne sont visibles qu'à l'expiration du jeton.
+    jwt_embed_user_claims: bool = False
+    # Cache du catalogue de voitures : "memory" (par process) ou "redis" (partagé)
+    cache_backend: str = "memory"
+    cache_redis_url: Optional[str] = None
+    cache_max_entries: int = 1024
+    cache_ttl_seconds: int = 300
+    # Planning d'occupation : une entrée par (voiture, jour), soit 15 500 pour 500 voitures sur un mois
+    occupancy_cache_max_entries: int = 50000
+    # Cycle de vie des réservations : passage à « terminée » puis archivage
+    booking_lifecycle_in_app: bool = True  # False si `python worker.py` tourne à part
+    booking_lifecycle_interval_seconds: int = 60
+    booking_lifecycle_batch_size: int = 1000
+    booking_archive_after_days: int = 90
+    # Flux d'événements (GET /events) : "memory" (un worker) ou "redis" (plusieurs workers)
+    events_backend: str = "memory"
+    events_redis_url: Optional[str] = None  # CACHE_REDIS_URL par défaut
+    events_queue_size: int = 100
+    events_heartbeat_seconds: int = 15
+    # Réponses rejouées pour un même en-tête Idempotency-Key (POST /bookings, /auth/register)
+    idempotency_ttl_seconds: int = 86400
+    idempotency_max_entries: int = 10000
+    # Limitation de débit par client (utilisateur ou IP) et par classe de route, en requêtes/minute
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # "redis" : seaux partagés entre workers
+    rate_limit_redis_url: Optional[str] = None  # CACHE_REDIS_URL par défaut
+    rate_limit_max_clients: int = 100000
+    rate_limit_auth_per_minute: int = 10  # /auth/login, /auth/register (bcrypt)
+    rate_limit_auth_burst: int = 5
+    rate_limit_expensive_per_minute: int = 30  # listes complètes, exports, analytics, imports
+    rate_limit_expensive_burst: int = 10
+    rate_limit_expensive_max_in_flight: int = 8  # par worker ; au-delà, 503
+    rate_limit_write_per_minute: int = 120
+    rate_limit_write_burst: int = 30
+    rate_limit_read_per_minute: int = 600
+    rate_limit_read_burst: int = 100
+    # Journalisation (fichier JSON + console, écrits par un thread dédié)
+    log_dir: str = "logs"
+    log_level: str = "INFO"
+    log_max_bytes: int = 5_000_000
+    log_backup_count: int = 3
+    log_rotate_interval_seconds: int = 86400
+    # Part des requêtes réussies journalisées (les erreurs le sont toujours)
+    log_success_sample_rate: float = 1.0
+    # Pool dédié au hachage bcrypt ; au-delà de max_pending, réponse 503
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 32
 
     @validator("cors_origins", pre=True)
     def split_cors_origins(cls, v):
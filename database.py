@@ -1,13 +1,83 @@
+import time
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from config import settings
 
 
-engine = create_async_engine(settings.database_url, echo=True)
+class PoolWaitStats:
+    """Temps d'attente pour obtenir une connexion du pool."""
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float):
+        self.count += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+
+pool_wait_stats = PoolWaitStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool qui mesure le temps passé à obtenir une connexion (attente + ouverture)."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_stats.record(time.perf_counter() - start)
+
+
+def engine_options(database_url: str) -> dict:
+    options = {"echo": settings.db_echo, "pool_pre_ping": settings.db_pool_pre_ping}
+    backend = make_url(database_url).get_backend_name()
+    # SQLite (tests, dev) utilise StaticPool / NullPool, qui n'acceptent pas ces réglages
+    if backend != "sqlite":
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+        )
+    if backend == "postgresql" and settings.db_statement_timeout_ms:
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": str(settings.db_statement_timeout_ms)}
+        }
+    return options
+
+
+engine = create_async_engine(settings.database_url, **engine_options(settings.database_url))
 SessionLocal = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
 Base = declarative_base()
 
 
+def pool_status() -> dict:
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    # Compteurs disponibles uniquement sur les pools à taille fixe (QueuePool)
+    if hasattr(pool, "checkedout"):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=settings.db_max_overflow,
+        )
+    status.update(
+        waits=pool_wait_stats.count,
+        wait_avg_ms=round(pool_wait_stats.total_seconds / pool_wait_stats.count * 1000, 3) if pool_wait_stats.count else 0.0,
+        wait_max_ms=round(pool_wait_stats.max_seconds * 1000, 3),
+    )
+    return status
+
+
 async def get_db():
     async with SessionLocal() as session:
         yield session
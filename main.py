@@ -1,23 +1,88 @@
 from fastapi import FastAPI, Request
-from database import engine, Base
-from routes import user, car, booking, auth
+from database import engine, Base, SessionLocal
+from routes import user, car, booking, auth, apprenti_accompagnateur, analytics, events, metrics as metrics_routes
+import asyncio
 import time
-from utils.logger import logger
+import uuid
+from utils.logger import RequestContext, logger, request_context, should_log_request
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 from fastapi.middleware.cors import CORSMiddleware
 from config import settings
+from utils.booking_index import booking_index
+from utils.booking_lifecycle import booking_lifecycle_loop
+from utils.booking_lock import reset_car_locks
+from utils.idempotency import IDEMPOTENT_REPLAY_HEADER
+from utils.pagination import NEXT_CURSOR_HEADER
+from utils.rate_limit import RateLimitMiddleware
+from utils.metrics import RequestDBStats, current_db_stats, metrics
+from contextlib import asynccontextmanager
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # En production le schéma est géré par Alembic : DB_CREATE_SCHEMA=false évite create_all à chaque démarrage
+    if settings.db_create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    async with SessionLocal() as session:
+        await booking_index.load(session)
+    reset_car_locks()
+    lifecycle_task = None
+    if settings.booking_lifecycle_in_app:
+        lifecycle_task = asyncio.create_task(booking_lifecycle_loop(settings.booking_lifecycle_interval_seconds))
+
+    yield
+
+    if lifecycle_task is not None:
+        lifecycle_task.cancel()
+        await asyncio.gather(lifecycle_task, return_exceptions=True)
+    await engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Avant log_requests : ajouté en premier, il s'exécute à l'intérieur, et les refus 429/503 sont journalisés
+app.add_middleware(RateLimitMiddleware)
 
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    logger.info(f"{request.method} {request.url} - {response.status_code} - {process_time:.2f}s")
-    return response
+    context = RequestContext(request.headers.get(REQUEST_ID_HEADER) or uuid.uuid4().hex)
+    context_token = request_context.set(context)
+    try:
+        db_stats = RequestDBStats()
+        db_token = current_db_stats.set(db_stats)
+        start_time = time.perf_counter()
+        try:
+            response = await call_next(request)
+        finally:
+            current_db_stats.reset(db_token)
+        process_time = time.perf_counter() - start_time
+
+        # Gabarit de la route (/cars/{car_id}) plutôt que l'URL, pour borner le nombre de séries
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        metrics.observe_request(request.method, route_path, response.status_code, process_time, db_stats)
+        response.headers[REQUEST_ID_HEADER] = context.request_id
+        if should_log_request(response.status_code):
+            logger.info(
+                f"{request.method} {request.url.path} - {response.status_code} - {process_time * 1000:.1f}ms",
+                extra={
+                    "method": request.method,
+                    "route": route_path,
+                    "status": response.status_code,
+                    "latency_ms": round(process_time * 1000, 3),
+                    "db_queries": db_stats.queries,
+                    "db_ms": round(db_stats.seconds * 1000, 3),
+                },
+            )
+        return response
+    finally:
+        # Même en cas d'exception : le contexte ne doit pas fuir vers la suite de la tâche
+        request_context.reset(context_token)
 
 
 app.add_middleware(
@@ -26,6 +91,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, REQUEST_ID_HEADER, IDEMPOTENT_REPLAY_HEADER, "Retry-After"],
 )
 
 @app.exception_handler(Exception)
@@ -43,11 +109,6 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
     logger.warning(f"Erreur de validation: {exc.errors()}")
     return JSONResponse(status_code=422, content={"detail": exc.errors()})
 
-@app.on_event("startup")
-async def create_tables():
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
-
 @app.get("/")
 async def home():
     return {"message": "Bienvenue sur Car2Go 🚗"}
@@ -56,6 +117,10 @@ app.include_router(user.router)
 app.include_router(car.router)
 app.include_router(booking.router)
 app.include_router(auth.router)
+app.include_router(apprenti_accompagnateur.router)
+app.include_router(analytics.router)
+app.include_router(events.router)
+app.include_router(metrics_routes.router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,91 @@
+"""Schéma initial (tables créées jusqu'ici par Base.metadata.create_all)
+
+Une base existante créée par create_all ou car2go.sql se marque avec
+`alembic stamp 0001` avant `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nom", sa.String(50), nullable=False),
+        sa.Column("prenom", sa.String(50), nullable=False),
+        sa.Column("email", sa.String(100), nullable=False, unique=True),
+        sa.Column("password", sa.String(255), nullable=False),
+        sa.Column("telephone", sa.String(20), nullable=False),
+        sa.Column("adresse", sa.String(200), nullable=False),
+        sa.Column("date_naissance", sa.Date(), nullable=False),
+        sa.Column("role", sa.String(20), nullable=False),
+        sa.Column("license_date", sa.Date(), nullable=True),
+        sa.Column("numero_permis", sa.String(20), nullable=True),
+        sa.Column("numero_livret", sa.String(20), nullable=True),
+        sa.CheckConstraint("role IN ('apprenti', 'accompagnateur')", name="users_role_check"),
+        sa.CheckConstraint(
+            "(role = 'accompagnateur' AND numero_permis IS NOT NULL AND numero_livret IS NULL) OR "
+            "(role = 'apprenti' AND numero_livret IS NOT NULL AND numero_permis IS NULL)",
+            name="users_check_combined",
+        ),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "cars",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("nom", sa.String(100), nullable=False),
+        sa.Column("modele", sa.String(100), nullable=False),
+        sa.Column("annee_fab", sa.Integer(), nullable=False),
+        sa.Column("type", sa.String(20), nullable=False),
+        sa.Column("plaque", sa.String(20), nullable=False, unique=True),
+        sa.Column("controle_technique", sa.Date(), nullable=False),
+        sa.Column("prix_par_heure", sa.DECIMAL(10, 2), nullable=False),
+        sa.Column("disponible", sa.Boolean()),
+        sa.Column("image_url", sa.String(255)),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.CheckConstraint("type IN ('double commande', 'classique')", name="cars_type_check"),
+    )
+    op.create_index("ix_cars_id", "cars", ["id"])
+
+    op.create_table(
+        "bookings",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("car_id", sa.Integer(), sa.ForeignKey("cars.id"), nullable=False),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("purpose", sa.String(20), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.Column("updated_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+        sa.CheckConstraint("purpose IN ('self', 'accompanied')", name="bookings_purpose_check"),
+        sa.CheckConstraint("status IN ('confirmée', 'annulée', 'terminée')", name="bookings_status_check"),
+    )
+    op.create_index("ix_bookings_id", "bookings", ["id"])
+
+    op.create_table(
+        "apprenti_accompagnateur",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("apprenti_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("accompagnateur_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("lien", sa.String(100), nullable=False),
+    )
+    op.create_index("ix_apprenti_accompagnateur_id", "apprenti_accompagnateur", ["id"])
+
+
+def downgrade():
+    op.drop_table("apprenti_accompagnateur")
+    op.drop_table("bookings")
+    op.drop_table("cars")
+    op.drop_table("users")
@@ -0,0 +1,50 @@
+"""Interdit le chevauchement de deux réservations d'une même voiture
+
+Contrainte d'exclusion GiST sur PostgreSQL, triggers équivalents sur SQLite.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+SQLITE_TRIGGERS = {
+    "bookings_no_overlap_insert": (
+        "CREATE TRIGGER bookings_no_overlap_insert BEFORE INSERT ON bookings "
+        "WHEN EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id "
+        "AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ),
+    "bookings_no_overlap_update": (
+        "CREATE TRIGGER bookings_no_overlap_update "
+        "BEFORE UPDATE OF car_id, start_time, end_time ON bookings "
+        "WHEN EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id AND id != NEW.id "
+        "AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ),
+}
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        op.execute(
+            "ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap "
+            "EXCLUDE USING gist (car_id WITH =, tsrange(start_time, end_time) WITH &&)"
+        )
+    elif op.get_bind().dialect.name == "sqlite":
+        for trigger in SQLITE_TRIGGERS.values():
+            op.execute(trigger)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("ALTER TABLE bookings DROP CONSTRAINT bookings_no_overlap")
+    elif op.get_bind().dialect.name == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER {name}")
@@ -0,0 +1,42 @@
+"""Index secondaires des requêtes chaudes
+
+Sur PostgreSQL les index sont construits avec CREATE INDEX CONCURRENTLY (hors
+transaction) pour ne pas bloquer les écritures sur une base en production.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    # Conflits et disponibilités : chevauchement par voiture
+    ("ix_bookings_car_period", "bookings", ["car_id", "start_time", "end_time"]),
+    # Fil des réservations d'un utilisateur, trié par date
+    ("ix_bookings_user_start", "bookings", ["user_id", "start_time"]),
+    ("ix_bookings_status", "bookings", ["status"]),
+    ("ix_cars_type", "cars", ["type"]),
+    ("ix_cars_disponible", "cars", ["disponible"]),
+    ("ix_users_role", "users", ["role"]),
+    ("ix_apprenti_accompagnateur_apprenti_id", "apprenti_accompagnateur", ["apprenti_id"]),
+    ("ix_apprenti_accompagnateur_accompagnateur_id", "apprenti_accompagnateur", ["accompagnateur_id"]),
+]
+
+
+def upgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=concurrently, if_not_exists=True)
+
+
+def downgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently, if_exists=True)
@@ -0,0 +1,120 @@
+"""Cycle de vie des réservations : historique et contraintes limitées aux réservations actives
+
+Seules les réservations confirmées bloquent un créneau : la contrainte
+d'exclusion, les triggers SQLite et l'index de chevauchement ne portent plus
+que sur elles. Les réservations terminées ou annulées sont archivées dans
+bookings_history.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+ACTIVE = "status = 'confirmée'"
+
+SQLITE_TRIGGERS = {
+    "bookings_no_overlap_insert": (
+        "CREATE TRIGGER bookings_no_overlap_insert BEFORE INSERT ON bookings "
+        "WHEN NEW.status = 'confirmée' AND EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id "
+        "AND status = 'confirmée' AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ),
+    "bookings_no_overlap_update": (
+        "CREATE TRIGGER bookings_no_overlap_update "
+        "BEFORE UPDATE OF car_id, start_time, end_time, status ON bookings "
+        "WHEN NEW.status = 'confirmée' AND EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id "
+        "AND id != NEW.id AND status = 'confirmée' AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ),
+}
+
+# Version 0002, rétablie par le downgrade
+PREVIOUS_SQLITE_TRIGGERS = {
+    "bookings_no_overlap_insert": (
+        "CREATE TRIGGER bookings_no_overlap_insert BEFORE INSERT ON bookings "
+        "WHEN EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id "
+        "AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ),
+    "bookings_no_overlap_update": (
+        "CREATE TRIGGER bookings_no_overlap_update "
+        "BEFORE UPDATE OF car_id, start_time, end_time ON bookings "
+        "WHEN EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id AND id != NEW.id "
+        "AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ),
+}
+
+
+def _replace_overlap_guard(condition, sqlite_triggers):
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("ALTER TABLE bookings DROP CONSTRAINT bookings_no_overlap")
+        op.execute(
+            "ALTER TABLE bookings ADD CONSTRAINT bookings_no_overlap "
+            "EXCLUDE USING gist (car_id WITH =, tsrange(start_time, end_time) WITH &&)"
+            + (f" WHERE ({condition})" if condition else "")
+        )
+    elif dialect == "sqlite":
+        for name, trigger in sqlite_triggers.items():
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+            op.execute(trigger)
+
+
+def upgrade():
+    op.create_table(
+        "bookings_history",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("car_id", sa.Integer(), nullable=False),
+        sa.Column("start_time", sa.DateTime(), nullable=False),
+        sa.Column("end_time", sa.DateTime(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False),
+        sa.Column("purpose", sa.String(20), nullable=False),
+        sa.Column("created_at", sa.TIMESTAMP()),
+        sa.Column("updated_at", sa.TIMESTAMP()),
+        sa.Column("archived_at", sa.TIMESTAMP(), server_default=sa.func.now()),
+    )
+    op.create_index("ix_bookings_history_user_id", "bookings_history", ["user_id"])
+    op.create_index("ix_bookings_history_car_id", "bookings_history", ["car_id"])
+    _replace_overlap_guard(ACTIVE, SQLITE_TRIGGERS)
+
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_bookings_active_car_period",
+            "bookings",
+            ["car_id", "start_time", "end_time"],
+            postgresql_where=sa.text(ACTIVE),
+            sqlite_where=sa.text(ACTIVE),
+            postgresql_concurrently=concurrently,
+            if_not_exists=True,
+        )
+        op.drop_index("ix_bookings_car_period", table_name="bookings", postgresql_concurrently=concurrently, if_exists=True)
+
+
+def downgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_bookings_car_period",
+            "bookings",
+            ["car_id", "start_time", "end_time"],
+            postgresql_concurrently=concurrently,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            "ix_bookings_active_car_period", table_name="bookings", postgresql_concurrently=concurrently, if_exists=True
+        )
+
+    _replace_overlap_guard(None, PREVIOUS_SQLITE_TRIGGERS)
+    op.drop_index("ix_bookings_history_car_id", table_name="bookings_history")
+    op.drop_index("ix_bookings_history_user_id", table_name="bookings_history")
+    op.drop_table("bookings_history")
@@ -0,0 +1,68 @@
+"""Cumuls journaliers des réservations pour /analytics
+
+Crée booking_daily_rollups et la remplit à partir des réservations existantes
+(table chaude et historique, hors annulations).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def _minutes_by_day(start_time, end_time):
+    day = start_time.date()
+    while datetime.combine(day, time()) < end_time:
+        next_midnight = datetime.combine(day + timedelta(days=1), time())
+        yield day, int((min(end_time, next_midnight) - max(start_time, datetime.combine(day, time()))).total_seconds() // 60)
+        day += timedelta(days=1)
+
+
+def upgrade():
+    rollups = op.create_table(
+        "booking_daily_rollups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("car_id", sa.Integer(), primary_key=True),
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("booked_minutes", sa.Integer(), nullable=False),
+        sa.Column("bookings", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_booking_daily_rollups_car_id", "booking_daily_rollups", ["car_id"])
+    op.create_index("ix_booking_daily_rollups_user_id", "booking_daily_rollups", ["user_id"])
+
+    totals = defaultdict(lambda: [0, 0])
+    for table in ("bookings", "bookings_history"):
+        result = op.get_bind().execute(sa.text(
+            f"SELECT car_id, user_id, start_time, end_time FROM {table} WHERE status != 'annulée'"
+        ))
+        for car_id, user_id, start_time, end_time in result:
+            if isinstance(start_time, str):  # SQLite
+                start_time, end_time = datetime.fromisoformat(start_time), datetime.fromisoformat(end_time)
+            for position, (day, minutes) in enumerate(_minutes_by_day(start_time, end_time)):
+                total = totals[(day, car_id, user_id)]
+                total[0] += minutes
+                total[1] += position == 0
+
+    rows = [
+        {"day": day, "car_id": car_id, "user_id": user_id, "booked_minutes": minutes, "bookings": count}
+        for (day, car_id, user_id), (minutes, count) in totals.items()
+    ]
+    for offset in range(0, len(rows), BACKFILL_CHUNK_SIZE):
+        op.bulk_insert(rollups, rows[offset:offset + BACKFILL_CHUNK_SIZE])
+
+
+def downgrade():
+    op.drop_index("ix_booking_daily_rollups_user_id", table_name="booking_daily_rollups")
+    op.drop_index("ix_booking_daily_rollups_car_id", table_name="booking_daily_rollups")
+    op.drop_table("booking_daily_rollups")
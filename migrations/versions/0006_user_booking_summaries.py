@@ -0,0 +1,35 @@
+"""Résumé des réservations par utilisateur (GET /users/me/summary)
+
+Pas de remplissage : chaque ligne est calculée à la première lecture ou
+mutation de réservation de l'utilisateur.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "user_booking_summaries",
+        sa.Column("user_id", sa.Integer(), primary_key=True),
+        sa.Column("driven_minutes", sa.Integer(), nullable=False),
+        sa.Column("upcoming_count", sa.Integer(), nullable=False),
+        sa.Column("next_booking_id", sa.Integer(), nullable=True),
+        sa.Column("next_car_id", sa.Integer(), nullable=True),
+        sa.Column("next_start_time", sa.DateTime(), nullable=True),
+        sa.Column("next_end_time", sa.DateTime(), nullable=True),
+        sa.Column("settled_at", sa.DateTime(), nullable=True),
+        sa.Column("refresh_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("user_booking_summaries")
@@ -0,0 +1,46 @@
+"""Index composites (filtre, id) pour les listes paginées par id
+
+Les listes filtrent sur une colonne puis paginent avec `ORDER BY id LIMIT n` :
+(type, id), (role, id) et (status, id) servent filtre et tri ensemble. L'index
+sur le booléen `cars.disponible`, trop peu sélectif, est supprimé.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+NEW_INDEXES = [
+    ("ix_bookings_status_id", "bookings", ["status", "id"]),
+    ("ix_cars_type_id", "cars", ["type", "id"]),
+    ("ix_users_role_id", "users", ["role", "id"]),
+]
+
+OLD_INDEXES = [
+    ("ix_bookings_status", "bookings", ["status"]),
+    ("ix_cars_type", "cars", ["type"]),
+    ("ix_cars_disponible", "cars", ["disponible"]),
+    ("ix_users_role", "users", ["role"]),
+]
+
+
+def _swap(create, drop):
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, columns in create:
+            op.create_index(name, table, columns, postgresql_concurrently=concurrently, if_not_exists=True)
+        for name, table, _ in drop:
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently, if_exists=True)
+
+
+def upgrade():
+    _swap(NEW_INDEXES, OLD_INDEXES)
+
+
+def downgrade():
+    _swap(OLD_INDEXES, NEW_INDEXES)
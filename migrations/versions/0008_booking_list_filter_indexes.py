@@ -0,0 +1,35 @@
+"""Index des filtres voiture et période de la liste des réservations
+
+`GET /bookings/` pagine par id avec des filtres optionnels : (car_id, id) sert
+le filtre par voiture et l'ordre ensemble ; (end_time, start_time) borne le
+filtre de période [start, end) sans parcourir toute la clé primaire.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_bookings_car_id", "bookings", ["car_id", "id"]),
+    ("ix_bookings_end_start", "bookings", ["end_time", "start_time"]),
+]
+
+
+def upgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=concurrently, if_not_exists=True)
+
+
+def downgrade():
+    concurrently = op.get_bind().dialect.name == "postgresql"
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=concurrently, if_exists=True)
@@ -0,0 +1,106 @@
+"""Recalcule les cumuls journaliers faussés par des créneaux vides ou inversés
+
+Le remplissage de 0005 (et la mise à jour des cumuls avant sa correction)
+comptait une réservation dont la fin ne suit pas le début : minutes nulles ou
+négatives, mais une réservation de plus. Les lignes (jour, voiture,
+utilisateur) concernées sont supprimées puis recalculées à partir des
+réservations, ces créneaux ne comptant plus pour rien.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+BOOKING_TABLES = ("bookings", "bookings_history")
+
+rollups = sa.table(
+    "booking_daily_rollups",
+    sa.column("day", sa.Date()),
+    sa.column("car_id", sa.Integer()),
+    sa.column("user_id", sa.Integer()),
+    sa.column("booked_minutes", sa.Integer()),
+    sa.column("bookings", sa.Integer()),
+)
+
+
+def _as_datetime(value):
+    return datetime.fromisoformat(value) if isinstance(value, str) else value  # SQLite : texte
+
+
+def _minutes_by_day(start_time, end_time):
+    # Même règle que utils.rollups.minutes_by_day : un créneau vide ou inversé ne compte pas
+    if end_time <= start_time:
+        return
+    day = start_time.date()
+    while datetime.combine(day, time()) < end_time:
+        next_midnight = datetime.combine(day + timedelta(days=1), time())
+        yield day, int((min(end_time, next_midnight) - max(start_time, datetime.combine(day, time()))).total_seconds() // 60)
+        day += timedelta(days=1)
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    # Jours faussés : l'ancien calcul n'attribuait un tel créneau qu'à son jour de début
+    days_by_owner = defaultdict(set)
+    for table in BOOKING_TABLES:
+        result = bind.execute(sa.text(
+            f"SELECT car_id, user_id, start_time FROM {table} "
+            "WHERE status != 'annulée' AND end_time <= start_time"
+        ))
+        for car_id, user_id, start_time in result:
+            days_by_owner[(car_id, user_id)].add(_as_datetime(start_time).date())
+    if not days_by_owner:
+        return
+
+    totals = {}
+    for (car_id, user_id), days in days_by_owner.items():
+        for day in days:
+            bind.execute(
+                sa.delete(rollups).where(rollups.c.day == day, rollups.c.car_id == car_id, rollups.c.user_id == user_id)
+            )
+            totals[(day, car_id, user_id)] = [0, 0]
+
+        # Réservations valides de la même voiture et du même utilisateur qui touchent ces jours
+        since = datetime.combine(min(days), time())
+        until = datetime.combine(max(days) + timedelta(days=1), time())
+        for table in BOOKING_TABLES:
+            result = bind.execute(
+                sa.text(
+                    f"SELECT start_time, end_time FROM {table} WHERE car_id = :car_id AND user_id = :user_id "
+                    "AND status != 'annulée' AND end_time > :since AND start_time < :until"
+                ).bindparams(
+                    sa.bindparam("since", since, type_=sa.DateTime()),
+                    sa.bindparam("until", until, type_=sa.DateTime()),
+                ),
+                {"car_id": car_id, "user_id": user_id},
+            )
+            for start_time, end_time in result:
+                for position, (day, minutes) in enumerate(_minutes_by_day(_as_datetime(start_time), _as_datetime(end_time))):
+                    total = totals.get((day, car_id, user_id))
+                    if total is not None:
+                        total[0] += minutes
+                        total[1] += position == 0
+
+    rows = [
+        {"day": day, "car_id": car_id, "user_id": user_id, "booked_minutes": minutes, "bookings": count}
+        for (day, car_id, user_id), (minutes, count) in totals.items()
+        if minutes or count
+    ]
+    if rows:
+        op.bulk_insert(rollups, rows)
+
+
+def downgrade():
+    # Correction de données : les anciens cumuls faussés ne sont pas restaurés
+    pass
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Date, Integer
+
+from database import Base
+
+
+class BookingDailyRollup(Base):
+    """Minutes réservées et nombre de réservations par jour, voiture et utilisateur.
+
+    Tenue à jour dans la transaction de chaque création, modification ou
+    suppression de réservation (voir utils/rollups.py). Les réservations
+    annulées n'y figurent pas ; l'archivage ne la modifie pas.
+    """
+
+    __tablename__ = "booking_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    car_id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, primary_key=True, index=True)
+    booked_minutes = Column(Integer, nullable=False, default=0)
+    # Réservation comptée le jour de son début
+    bookings = Column(Integer, nullable=False, default=0)
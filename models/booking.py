@@ -1,7 +1,13 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, TIMESTAMP, func, CheckConstraint
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, TIMESTAMP, func, CheckConstraint, DDL, Index, column, event, literal, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from database import Base
 
+# Seules les réservations confirmées bloquent un créneau ; terminées et annulées
+# finissent archivées dans bookings_history (voir utils/booking_lifecycle.py)
+ACTIVE_BOOKING_STATUS = "confirmée"
+ACTIVE_BOOKING_CONDITION = "status = 'confirmée'"
+
 class Booking(Base):
     __tablename__ = "bookings"
 
@@ -22,4 +28,86 @@ class Booking(Base):
     __table_args__ = (
         CheckConstraint("purpose IN ('self', 'accompanied')", name="bookings_purpose_check"),
         CheckConstraint("status IN ('confirmée', 'annulée', 'terminée')", name="bookings_status_check"),
-    )
\ No newline at end of file
+        # Recherche de chevauchements par voiture (conflits, disponibilités), réservations actives seulement
+        Index(
+            "ix_bookings_active_car_period",
+            "car_id",
+            "start_time",
+            "end_time",
+            postgresql_where=text(ACTIVE_BOOKING_CONDITION),
+            sqlite_where=text(ACTIVE_BOOKING_CONDITION),
+        ),
+        # Fil des réservations d'un utilisateur, trié par date
+        Index("ix_bookings_user_start", "user_id", "start_time"),
+        # Liste filtrée par statut, paginée par id
+        Index("ix_bookings_status_id", "status", "id"),
+        # Liste filtrée par voiture, paginée par id
+        Index("ix_bookings_car_id", "car_id", "id"),
+        # Liste filtrée par période : réservations qui se terminent après le début demandé
+        Index("ix_bookings_end_start", "end_time", "start_time"),
+        # Deux réservations actives d'une même voiture ne peuvent pas se chevaucher (PostgreSQL + btree_gist)
+        ExcludeConstraint(
+            ("car_id", "="),
+            (func.tsrange(column("start_time"), column("end_time")), "&&"),
+            using="gist",
+            name="bookings_no_overlap",
+            where=text(ACTIVE_BOOKING_CONDITION),
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql"),
+)
+
+# Équivalent SQLite de la contrainte d'exclusion (tests, développement local)
+event.listen(
+    Booking.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS bookings_no_overlap_insert BEFORE INSERT ON bookings "
+        "WHEN NEW.status = 'confirmée' AND EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id "
+        "AND status = 'confirmée' AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ).execute_if(dialect="sqlite"),
+)
+event.listen(
+    Booking.__table__,
+    "after_create",
+    DDL(
+        "CREATE TRIGGER IF NOT EXISTS bookings_no_overlap_update "
+        "BEFORE UPDATE OF car_id, start_time, end_time, status ON bookings "
+        "WHEN NEW.status = 'confirmée' AND EXISTS (SELECT 1 FROM bookings WHERE car_id = NEW.car_id "
+        "AND id != NEW.id AND status = 'confirmée' AND end_time > NEW.start_time AND start_time < NEW.end_time) "
+        "BEGIN SELECT RAISE(ABORT, 'bookings_no_overlap'); END"
+    ).execute_if(dialect="sqlite"),
+)
+
+
+def is_active(booking=Booking):
+    """Filtre des réservations actives (`booking` peut être un alias de Booking).
+
+    Le statut est écrit en littéral dans le SQL, et non en paramètre, pour que
+    les index partiels restent utilisables.
+    """
+    return booking.status == literal(ACTIVE_BOOKING_STATUS, literal_execute=True)
+
+
+class BookingHistory(Base):
+    """Réservations terminées ou annulées, sorties de la table chaude par l'archivage."""
+
+    __tablename__ = "bookings_history"
+
+    # Même identifiant que dans bookings
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    car_id = Column(Integer, nullable=False, index=True)
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    status = Column(String(20), nullable=False)
+    purpose = Column(String(20), nullable=False)
+    created_at = Column(TIMESTAMP)
+    updated_at = Column(TIMESTAMP)
+    archived_at = Column(TIMESTAMP, server_default=func.now())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Boolean, TIMESTAMP, DECIMAL, CheckConstraint
+from sqlalchemy import Column, Integer, String, Date, Boolean, TIMESTAMP, DECIMAL, CheckConstraint, Index
 from sqlalchemy.sql import func
 from database import Base
 from sqlalchemy.orm import relationship
@@ -22,6 +22,8 @@ class Car(Base):
 
     __table_args__ = (
         CheckConstraint("type IN ('double commande', 'classique')", name="cars_type_check"),
+        # Liste filtrée par type, paginée par id
+        Index("ix_cars_type_id", "type", "id"),
     )
 
     bookings = relationship("Booking", back_populates="car")
\ No newline at end of file
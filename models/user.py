@@ -1,10 +1,8 @@
-from sqlalchemy import Column, Integer, String, Date, CheckConstraint
+from sqlalchemy import Column, Integer, String, Date, DateTime, CheckConstraint, Index
 from database import Base
 from sqlalchemy.orm import relationship
-from passlib.context import CryptContext
 from sqlalchemy import ForeignKey
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from utils.password import get_password_context
 
 class User(Base):
     __tablename__ = "users"
@@ -24,12 +22,12 @@ class User(Base):
 
     def verify_password(self, password: str) -> bool:
         """Vérifie si le mot de passe fourni correspond au hash stocké."""
-        return pwd_context.verify(password, self.password)
+        return get_password_context().verify(password, self.password)
 
     @staticmethod
     def hash_password(password: str) -> str:
         """Hache un mot de passe avant de le stocker."""
-        return pwd_context.hash(password)
+        return get_password_context().hash(password)
 
     __table_args__ = (
         CheckConstraint("role IN ('apprenti', 'accompagnateur')", name="users_role_check"),
@@ -38,7 +36,8 @@ class User(Base):
             "(role = 'apprenti' AND numero_livret IS NOT NULL AND numero_permis IS NULL)",
             name="users_check_combined"
         ),
-
+        # Liste filtrée par rôle, paginée par id
+        Index("ix_users_role_id", "role", "id"),
     )
     bookings = relationship("Booking", back_populates="user")
 
@@ -47,10 +46,32 @@ class ApprentiAccompagnateur(Base):
     __tablename__ = "apprenti_accompagnateur"
 
     id = Column(Integer, primary_key=True, index=True)
-    apprenti_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    accompagnateur_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    apprenti_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    accompagnateur_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     lien = Column(String(100), nullable=False)  # Champ libre pour indiquer la relation
 
     # Relation avec la table users
     apprenti = relationship("User", foreign_keys=[apprenti_id])
     accompagnateur = relationship("User", foreign_keys=[accompagnateur_id])
+
+
+class UserBookingSummary(Base):
+    """Résumé des réservations d'un utilisateur pour l'en-tête du tableau de bord.
+
+    Mis à jour dans la transaction de chaque mutation de réservation (voir
+    utils/user_summary.py). `driven_minutes` cumule les réservations non annulées
+    terminées avant `settled_at` ; la ligne est recalculée à la lecture une fois
+    `refresh_at` (fin de la prochaine réservation) dépassé.
+    """
+
+    __tablename__ = "user_booking_summaries"
+
+    user_id = Column(Integer, primary_key=True)
+    driven_minutes = Column(Integer, nullable=False, default=0)
+    upcoming_count = Column(Integer, nullable=False, default=0)
+    next_booking_id = Column(Integer, nullable=True)
+    next_car_id = Column(Integer, nullable=True)
+    next_start_time = Column(DateTime, nullable=True)
+    next_end_time = Column(DateTime, nullable=True)
+    settled_at = Column(DateTime, nullable=True)
+    refresh_at = Column(DateTime, nullable=True)
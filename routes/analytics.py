@@ -0,0 +1,143 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from database import get_db
+from models.analytics import BookingDailyRollup
+from models.car import Car
+from models.user import ApprentiAccompagnateur, User
+from routes.auth import get_current_user
+from schemas.analytics import RevenueResponse, RevenueRow, UtilizationResponse, UtilizationRow
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+router = APIRouter(prefix="/analytics", tags=["Analytique"])
+
+GROUP_BY_PATTERN = "^(car|type|day|week|accompagnateur)$"
+MINUTES_PER_DAY = 24 * 60
+CENT = Decimal("0.01")
+
+
+def _week_start(day: date) -> date:
+    return day - timedelta(days=day.weekday())
+
+
+def _check_period(start: date, end: date):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="La date de fin doit être postérieure à la date de début")
+
+
+async def _aggregate(db: AsyncSession, start: date, end: date, group_by: str):
+    """Cumuls (clé, libellé, minutes, réservations, chiffre d'affaires) par groupe, depuis booking_daily_rollups.
+
+    Le chiffre d'affaires applique le tarif horaire actuel de chaque voiture.
+    Un apprenti suivi par plusieurs accompagnateurs compte pour chacun d'eux.
+    """
+    rollup = BookingDailyRollup
+    measures = [
+        func.sum(rollup.booked_minutes),
+        func.sum(rollup.bookings),
+        func.sum(rollup.booked_minutes * Car.prix_par_heure),
+    ]
+    # Clé du groupe et, pour les voitures et accompagnateurs, libellé lisible
+    if group_by == "car":
+        dimensions = [Car.id, Car.nom + " " + Car.modele + " (" + Car.plaque + ")"]
+    elif group_by == "type":
+        dimensions = [Car.type]
+    elif group_by in ("day", "week"):
+        dimensions = [rollup.day]
+    else:
+        dimensions = [User.id, User.prenom + " " + User.nom]
+
+    stmt = (
+        select(*dimensions, *measures)
+        .join(Car, Car.id == rollup.car_id)
+        .where(rollup.day >= start, rollup.day < end)
+        .group_by(*dimensions)
+        .order_by(dimensions[0])
+    )
+    if group_by == "accompagnateur":
+        stmt = (
+            stmt.join(ApprentiAccompagnateur, ApprentiAccompagnateur.apprenti_id == rollup.user_id)
+            .join(User, User.id == ApprentiAccompagnateur.accompagnateur_id)
+        )
+    rows = (await db.execute(stmt)).all()
+
+    groups = {}
+    for row in rows:
+        key = _week_start(row[0]) if group_by == "week" else row[0]
+        label = row[1] if len(dimensions) > 1 else None
+        minutes, count, price_minutes = row[-3:]
+        group = groups.setdefault(str(key), [label, 0, 0, Decimal(0)])
+        group[1] += minutes or 0
+        group[2] += count or 0
+        group[3] += Decimal(str(price_minutes or 0)) / 60
+    return groups
+
+
+async def _fleet_minutes(db: AsyncSession, start: date, end: date, group_by: str) -> dict:
+    """Minutes disponibles de la flotte actuelle par groupe (dénominateur de l'utilisation)."""
+    days = (end - start).days
+    if group_by == "car":
+        car_ids = (await db.execute(select(Car.id))).scalars().all()
+        return {str(car_id): days * MINUTES_PER_DAY for car_id in car_ids}
+    if group_by == "type":
+        result = await db.execute(select(Car.type, func.count(Car.id)).group_by(Car.type))
+        return {car_type: count * days * MINUTES_PER_DAY for car_type, count in result.all()}
+    if group_by in ("day", "week"):
+        fleet = (await db.execute(select(func.count(Car.id)))).scalar() or 0
+        minutes = defaultdict(int)
+        for offset in range(days):
+            day = start + timedelta(days=offset)
+            minutes[str(_week_start(day) if group_by == "week" else day)] += fleet * MINUTES_PER_DAY
+        return minutes
+    return {}
+
+# Taux d'occupation de la flotte
+@router.get("/utilization", response_model=UtilizationResponse)
+async def get_utilization(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    group_by: str = Query("car", pattern=GROUP_BY_PATTERN),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _check_period(start, end)
+    groups = await _aggregate(db, start, end, group_by)
+    available = await _fleet_minutes(db, start, end, group_by)
+    rows = [
+        UtilizationRow(
+            key=key,
+            label=label,
+            bookings=count,
+            booked_hours=round(minutes / 60, 2),
+            utilization=round(minutes / available[key], 4) if available.get(key) else None,
+        )
+        for key, (label, minutes, count, _) in groups.items()
+    ]
+    return UtilizationResponse(start=start, end=end, group_by=group_by, rows=rows)
+
+# Chiffre d'affaires (tarif horaire × heures réservées)
+@router.get("/revenue", response_model=RevenueResponse)
+async def get_revenue(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    group_by: str = Query("car", pattern=GROUP_BY_PATTERN),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    _check_period(start, end)
+    groups = await _aggregate(db, start, end, group_by)
+    rows = [
+        RevenueRow(
+            key=key,
+            label=label,
+            bookings=count,
+            booked_hours=round(minutes / 60, 2),
+            revenue=revenue.quantize(CENT),
+        )
+        for key, (label, minutes, count, revenue) in groups.items()
+    ]
+    total = sum((row.revenue for row in rows), Decimal(0))
+    return RevenueResponse(start=start, end=end, group_by=group_by, total=total, rows=rows)
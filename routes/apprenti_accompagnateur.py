@@ -1,5 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import joinedload
 from database import get_db
 from models.user import ApprentiAccompagnateur, User
 from schemas.apprenti_accompagnateur import ApprentiAccompagnateurCreate, ApprentiAccompagnateurResponse
@@ -10,12 +12,21 @@ router = APIRouter(
     tags=["Apprenti & Accompagnateur"]
 )
 
+# Les deux utilisateurs sont chargés dans la même requête que l'association (pas de lazy load)
+WITH_USERS = (
+    joinedload(ApprentiAccompagnateur.apprenti),
+    joinedload(ApprentiAccompagnateur.accompagnateur),
+)
+
 @router.post("/", response_model=ApprentiAccompagnateurResponse)
-def create_apprenti_accompagnateur(
+async def create_apprenti_accompagnateur(
     assoc: ApprentiAccompagnateurCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    if isinstance(current_user, dict):
+        current_user = User(**current_user)
+
     # Vérifier que l'utilisateur connecté est bien un apprenti ou un accompagnateur
     if current_user.role not in ["apprenti", "accompagnateur"]:
         raise HTTPException(status_code=403, detail="Seuls les apprentis et accompagnateurs peuvent créer une association.")
@@ -28,9 +39,16 @@ def create_apprenti_accompagnateur(
         apprenti_id = assoc.apprenti_id
         accompagnateur_id = current_user.id
 
-    # Vérifier si l'autre utilisateur existe et a le bon rôle
-    apprenti = db.query(User).filter(User.id == apprenti_id, User.role == "apprenti").first()
-    accompagnateur = db.query(User).filter(User.id == accompagnateur_id, User.role == "accompagnateur").first()
+    # Vérifier si l'autre utilisateur existe et a le bon rôle (une seule requête pour les deux)
+    result = await db.execute(
+        select(User).where(
+            ((User.id == apprenti_id) & (User.role == "apprenti"))
+            | ((User.id == accompagnateur_id) & (User.role == "accompagnateur"))
+        )
+    )
+    users = {(user.id, user.role): user for user in result.scalars().all()}
+    apprenti = users.get((apprenti_id, "apprenti"))
+    accompagnateur = users.get((accompagnateur_id, "accompagnateur"))
 
     if not apprenti:
         raise HTTPException(status_code=400, detail="L'utilisateur spécifié comme apprenti n'a pas le rôle 'apprenti'.")
@@ -38,46 +56,59 @@ def create_apprenti_accompagnateur(
         raise HTTPException(status_code=400, detail="L'utilisateur spécifié comme accompagnateur n'a pas le rôle 'accompagnateur'.")
 
     new_assoc = ApprentiAccompagnateur(
-        apprenti_id=apprenti_id,
-        accompagnateur_id=accompagnateur_id,
+        apprenti=apprenti,
+        accompagnateur=accompagnateur,
         lien=assoc.lien
     )
 
     db.add(new_assoc)
-    db.commit()
-    db.refresh(new_assoc)
+    await db.commit()
 
     return new_assoc
 
-@router.get("/{apprenti_id}", response_model=list[ApprentiAccompagnateurResponse])
-def get_accompagnateurs_for_apprenti(
+@router.get("/apprenti/{apprenti_id}", response_model=list[ApprentiAccompagnateurResponse])
+async def get_accompagnateurs_for_apprenti(
     apprenti_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    if isinstance(current_user, dict):
+        current_user = User(**current_user)
+
     # Vérifier si l'utilisateur est bien l'apprenti ou un administrateur
     if current_user.id != apprenti_id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Accès interdit. Vous ne pouvez voir que vos propres accompagnateurs.")
 
-    accompagnateurs = db.query(ApprentiAccompagnateur).filter(ApprentiAccompagnateur.apprenti_id == apprenti_id).all()
+    result = await db.execute(
+        select(ApprentiAccompagnateur)
+        .options(*WITH_USERS)
+        .where(ApprentiAccompagnateur.apprenti_id == apprenti_id)
+    )
+    accompagnateurs = result.scalars().all()
     if not accompagnateurs:
         raise HTTPException(status_code=404, detail="Aucun accompagnateur trouvé pour cet apprenti.")
 
     return accompagnateurs
 
-@router.get("/{accompagnateur_id}", response_model=list[ApprentiAccompagnateurResponse])
-def get_apprentis_for_accompagnateur(
+@router.get("/accompagnateur/{accompagnateur_id}", response_model=list[ApprentiAccompagnateurResponse])
+async def get_apprentis_for_accompagnateur(
     accompagnateur_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    if isinstance(current_user, dict):
+        current_user = User(**current_user)
+
     # Vérifier si l'utilisateur est bien l'accompagnateur ou un administrateur
     if current_user.id != accompagnateur_id and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Accès interdit. Vous ne pouvez voir que vos propres apprentis.")
 
-    apprentis = db.query(ApprentiAccompagnateur).filter(
-        ApprentiAccompagnateur.accompagnateur_id == accompagnateur_id
-    ).all()
+    result = await db.execute(
+        select(ApprentiAccompagnateur)
+        .options(*WITH_USERS)
+        .where(ApprentiAccompagnateur.accompagnateur_id == accompagnateur_id)
+    )
+    apprentis = result.scalars().all()
 
     if not apprentis:
         raise HTTPException(status_code=404, detail="Aucun apprenti trouvé pour cet accompagnateur.")
@@ -85,12 +116,16 @@ def get_apprentis_for_accompagnateur(
     return apprentis
 
 @router.delete("/{id}")
-def delete_apprenti_accompagnateur(
+async def delete_apprenti_accompagnateur(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    assoc = db.query(ApprentiAccompagnateur).filter(ApprentiAccompagnateur.id == id).first()
+    if isinstance(current_user, dict):
+        current_user = User(**current_user)
+
+    result = await db.execute(select(ApprentiAccompagnateur).where(ApprentiAccompagnateur.id == id))
+    assoc = result.scalar_one_or_none()
 
     if not assoc:
         raise HTTPException(status_code=404, detail="Association non trouvée.")
@@ -99,7 +134,7 @@ def delete_apprenti_accompagnateur(
     if current_user.id not in [assoc.apprenti_id, assoc.accompagnateur_id] and current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Accès interdit. Vous ne pouvez supprimer que vos propres relations.")
 
-    db.delete(assoc)
-    db.commit()
+    await db.delete(assoc)
+    await db.commit()
 
-    return {"message": "Association supprimée avec succès"}
\ No newline at end of file
+    return {"message": "Association supprimée avec succès"}
@@ -1,21 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from database import get_db
 from models.user import User
 from schemas.auth import UserRegister, TokenResponse
-from utils.auth import create_access_token, verify_token
-from passlib.context import CryptContext
+from utils.auth import ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, user_claims, verify_token
+from utils.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
+from utils.logger import request_context
+from utils.password import password_hasher
+from utils.token_cache import token_cache
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from typing import Optional
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
 
 @router.post("/register", response_model=TokenResponse)
-async def register(user: UserRegister, db: AsyncSession = Depends(get_db)):
+async def register(
+    user: UserRegister,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_db),
+):
+    # Pas encore d'utilisateur : la portée est l'email demandé, pour que deux clients anonymes
+    # réutilisant la même clé ne se répondent pas l'un l'autre. Le jeton rejoué ne doit pas
+    # survivre à sa propre expiration : conservation limitée à sa durée de vie.
+    scope = "anonymous:register:" + hashlib.sha256(user.email.lower().encode()).hexdigest()
+    return await run_idempotent(
+        idempotency_key,
+        scope,
+        user,
+        lambda: _register(user, db),
+        TokenResponse,
+        ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    )
+
 
+async def _register(user: UserRegister, db: AsyncSession) -> dict:
     stmt = select(User).where(User.email == user.email)
     result = await db.execute(stmt)
     db_user = result.scalar_one_or_none()
@@ -31,7 +54,7 @@ async def register(user: UserRegister, db: AsyncSession = Depends(get_db)):
         if not user.license_date:
             raise HTTPException(status_code=400, detail="Un accompagnateur doit avoir une date d'obtention de permis.")
 
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     new_user = User(
         nom=user.nom,
         prenom=user.prenom,
@@ -50,7 +73,7 @@ async def register(user: UserRegister, db: AsyncSession = Depends(get_db)):
     await db.commit()
     await db.refresh(new_user)
 
-    token = create_access_token({"sub": new_user.email})
+    token = create_access_token(user_claims(new_user))
     return {"access_token": token, "token_type": "bearer"}
 
 
@@ -60,13 +83,13 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSessi
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
 
-    if not user or not pwd_context.verify(form_data.password, user.hash_password(form_data.password)):
+    if not user or not await password_hasher.verify(form_data.password, user.password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
 
-    token = create_access_token({"sub": user.email})
+    token = create_access_token(user_claims(user))
     return {"access_token": token, "token_type": "bearer"}
 
 
@@ -76,7 +99,31 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     if payload is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+    current_user = await _resolve_user(payload, token, db)
+    # Rattache l'utilisateur aux logs de la requête en cours
+    context = request_context.get()
+    if context is not None:
+        context.user_id = current_user["id"]
+    return current_user
+
+
+async def _resolve_user(payload: dict, token: str, db: AsyncSession) -> dict:
     email = payload.get("sub")
+    # Profil embarqué dans le jeton : pas de requête SQL
+    if "id" in payload and "role" in payload:
+        return {
+            "id": payload["id"],
+            "nom": payload.get("nom"),
+            "prenom": payload.get("prenom"),
+            "email": email,
+            "role": payload["role"],
+        }
+
+    cache_key = payload.get("jti") or token
+    cached_user = token_cache.get(cache_key)
+    if cached_user is not None:
+        return dict(cached_user)
+
     stmt = select(User).where(User.email == email)
     result = await db.execute(stmt)
     user = result.scalar_one_or_none()
@@ -84,4 +131,6 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    return {"id": user.id, "nom": user.nom, "prenom": user.prenom, "email": user.email, "role": user.role}
\ No newline at end of file
+    current_user = {"id": user.id, "nom": user.nom, "prenom": user.prenom, "email": user.email, "role": user.role}
+    token_cache.set(cache_key, current_user, payload.get("exp"))
+    return current_user
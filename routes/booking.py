@@ -1,56 +1,343 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from routes.auth import get_current_user
 from models.user import User
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import union_all
 from sqlalchemy.future import select
-from models.booking import Booking
+from models.booking import ACTIVE_BOOKING_STATUS, Booking, BookingHistory, is_active
 from models.car import Car
-from schemas.booking import BookingCreate, BookingUpdate, BookingResponse
+from schemas.booking import (
+    BookingCreate,
+    BookingUpdate,
+    BookingResponse,
+    BookingBatchCreate,
+    BookingRecurrenceCreate,
+    BookingBatchResponse,
+    BookingSlotConflict,
+    UserBookingResponse,
+)
 from database import get_db
-from datetime import datetime
-from typing import List
+from utils.booking_index import BookingIntervalIndex, _naive_utc, booking_index
+from utils.booking_lock import car_lock, is_overlap_violation
+from utils.events import publish_event
+from utils.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
+from utils.occupancy import invalidate_occupancy
+from utils.rollups import apply_rollup_delta, booking_facts
+from utils.user_summary import refresh_user_summary
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, page_items
+from datetime import datetime, timedelta
+from typing import List, Optional
+from collections import defaultdict
+from contextlib import AsyncExitStack
+from decimal import Decimal
+import csv
+import io
+import json
 
 router = APIRouter(prefix="/bookings", tags=["Réservations"])
 
+BOOKING_CONFLICT_DETAIL = "Car is already booked for the selected time range"
+INVALID_PERIOD_DETAIL = "La fin du créneau doit être postérieure à son début"
+
+
+def _is_valid_period(start_time: datetime, end_time: datetime) -> bool:
+    # Créneau vide ou inversé : tsrange() le refuse sur PostgreSQL (500) et il fausserait l'index
+    return _naive_utc(end_time) > _naive_utc(start_time)
+
+
+async def _after_booking_change(*periods):
+    """À appeler après chaque commit modifiant des créneaux (car_id, début, fin) : met à jour les vues dérivées."""
+    for car_id, start_time, end_time in periods:
+        await invalidate_occupancy(car_id, start_time, end_time)
+        await publish_event("car.availability", {"car_id": car_id, "start_time": start_time, "end_time": end_time})
+
+
+async def _publish_booking(event_type: str, booking: Booking):
+    # Événement privé : seul le titulaire de la réservation le reçoit
+    await publish_event(event_type, {
+        "id": booking.id,
+        "car_id": booking.car_id,
+        "start_time": booking.start_time,
+        "end_time": booking.end_time,
+        "status": booking.status,
+    }, user_id=booking.user_id)
+
+
 # Créer une réservation
 @router.post("/", response_model=BookingResponse)
-async def create_booking(booking: BookingCreate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def create_booking(
+    booking: BookingCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     if not current_user:
         raise HTTPException(status_code=401, detail="Non autorisé")
-    # Vérifier les conflits de réservation pour la même voiture
-    conflict_stmt = select(Booking).where(
-        Booking.car_id == booking.car_id,
-        Booking.end_time > booking.start_time,
-        Booking.start_time < booking.end_time,
-    )
-    result = await db.execute(conflict_stmt)
-    conflict = result.scalars().first()
-    if conflict:
-        raise HTTPException(status_code=400, detail="Car is already booked for the selected time range")
-
-    new_booking = Booking(
-        **booking.dict(),
-        status="confirmée",
-        created_at=datetime.utcnow(),
-        updated_at=datetime.utcnow(),
+    return await run_idempotent(
+        idempotency_key, _idempotency_scope(current_user, "bookings"), booking,
+        lambda: _create_booking(db, booking), BookingResponse,
     )
-    db.add(new_booking)
-    await db.commit()
-    await db.refresh(new_booking)
+
+
+def _idempotency_scope(current_user, route: str) -> str:
+    user_id = current_user["id"] if isinstance(current_user, dict) else current_user.id
+    return f"{user_id}:{route}"
+
+
+async def _create_booking(db: AsyncSession, booking: BookingCreate) -> Booking:
+    if not _is_valid_period(booking.start_time, booking.end_time):
+        raise HTTPException(status_code=400, detail=INVALID_PERIOD_DETAIL)
+    async with car_lock(db, booking.car_id):
+        # Index en mémoire d'abord ; un conflit n'y est qu'un indice, confirmé en base
+        if await booking_index.confirm_conflict(db, booking.car_id, booking.start_time, booking.end_time) is not None:
+            raise HTTPException(status_code=400, detail=BOOKING_CONFLICT_DETAIL)
+
+        new_booking = Booking(
+            **booking.dict(),
+            status="confirmée",
+            created_at=datetime.utcnow(),
+            updated_at=datetime.utcnow(),
+        )
+        db.add(new_booking)
+        # La contrainte d'exclusion reste la vérification finale (autres workers, index périmé)
+        try:
+            # Cumuls analytiques dans la même transaction (l'insertion y est déjà envoyée par autoflush)
+            await apply_rollup_delta(db, added=[booking_facts(new_booking)])
+            await refresh_user_summary(db, new_booking.user_id, added=[booking_facts(new_booking)])
+            await db.commit()
+        except IntegrityError as exc:
+            if is_overlap_violation(exc):
+                raise HTTPException(status_code=400, detail=BOOKING_CONFLICT_DETAIL)
+            raise
+        await db.refresh(new_booking)
+        booking_index.add(new_booking.id, new_booking.car_id, new_booking.start_time, new_booking.end_time)
+    await _after_booking_change((new_booking.car_id, new_booking.start_time, new_booking.end_time))
+    await _publish_booking("booking.created", new_booking)
     return new_booking
 
-# Récupérer toutes les réservations
+MAX_BATCH_SLOTS = 500
+
+
+async def _create_bookings(db: AsyncSession, slots: List[BookingCreate]) -> BookingBatchResponse:
+    """Réserve plusieurs créneaux en une transaction, une requête de plages par voiture.
+
+    Les créneaux en conflit (avec la base ou entre eux) sont ignorés et signalés un par un.
+    """
+    slots_by_car = defaultdict(list)
+    for position, slot in enumerate(slots):
+        # Dates avec et sans fuseau mêlées dans un lot : tout en UTC naïf, comme les colonnes
+        slot = slot.copy(update={"start_time": _naive_utc(slot.start_time), "end_time": _naive_utc(slot.end_time)})
+        slots_by_car[slot.car_id].append((position, slot))
+
+    conflicts = []
+    accepted = []
+    async with AsyncExitStack() as stack:
+        # Ordre fixe des verrous pour éviter les interblocages entre deux lots
+        for car_id in sorted(slots_by_car):
+            await stack.enter_async_context(car_lock(db, car_id))
+
+        for car_id, car_slots in slots_by_car.items():
+            window_start = min(slot.start_time for _, slot in car_slots)
+            window_end = max(slot.end_time for _, slot in car_slots)
+            result = await db.execute(
+                select(Booking.id, Booking.start_time, Booking.end_time).where(
+                    Booking.car_id == car_id,
+                    is_active(),
+                    Booking.end_time > window_start,
+                    Booking.start_time < window_end,
+                )
+            )
+            taken = BookingIntervalIndex()
+            for booking_id, start_time, end_time in result.all():
+                taken.add(booking_id, car_id, start_time, end_time)
+
+            for position, slot in car_slots:
+                if not _is_valid_period(slot.start_time, slot.end_time):
+                    detail = INVALID_PERIOD_DETAIL
+                elif taken.find_conflict(car_id, slot.start_time, slot.end_time) is not None:
+                    detail = BOOKING_CONFLICT_DETAIL
+                else:
+                    # Identifiant provisoire négatif : détecte aussi les chevauchements internes au lot
+                    taken.add(-(position + 1), car_id, slot.start_time, slot.end_time)
+                    accepted.append((position, slot))
+                    continue
+                conflicts.append(BookingSlotConflict(
+                    index=position,
+                    car_id=car_id,
+                    start_time=slot.start_time,
+                    end_time=slot.end_time,
+                    detail=detail,
+                ))
+
+        now = datetime.utcnow()
+        accepted.sort(key=lambda item: item[0])
+        new_bookings = [
+            Booking(**slot.dict(), status="confirmée", created_at=now, updated_at=now)
+            for _, slot in accepted
+        ]
+        db.add_all(new_bookings)
+        try:
+            await apply_rollup_delta(db, added=[booking_facts(booking) for booking in new_bookings])
+            for user_id in sorted({booking.user_id for booking in new_bookings}):
+                await refresh_user_summary(db, user_id, added=[
+                    booking_facts(booking) for booking in new_bookings if booking.user_id == user_id
+                ])
+            await db.commit()
+        except IntegrityError as exc:
+            if is_overlap_violation(exc):
+                raise HTTPException(status_code=400, detail=BOOKING_CONFLICT_DETAIL)
+            raise
+
+    for new_booking in new_bookings:
+        booking_index.add(new_booking.id, new_booking.car_id, new_booking.start_time, new_booking.end_time)
+    await _after_booking_change(*((booking.car_id, booking.start_time, booking.end_time) for booking in new_bookings))
+    for new_booking in new_bookings:
+        await _publish_booking("booking.created", new_booking)
+    conflicts.sort(key=lambda conflict: conflict.index)
+    return BookingBatchResponse(created=new_bookings, conflicts=conflicts)
+
+# Créer plusieurs réservations en une requête
+@router.post("/batch", response_model=BookingBatchResponse)
+async def create_bookings_batch(
+    batch: BookingBatchCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Non autorisé")
+    if not batch.bookings or len(batch.bookings) > MAX_BATCH_SLOTS:
+        raise HTTPException(status_code=400, detail=f"Un lot doit contenir entre 1 et {MAX_BATCH_SLOTS} créneaux")
+    return await run_idempotent(
+        idempotency_key, _idempotency_scope(current_user, "bookings/batch"), batch,
+        lambda: _create_bookings(db, batch.bookings), BookingBatchResponse,
+    )
+
+# Créer une série de réservations récurrentes (ex. chaque mardi 18h-19h pendant 10 semaines)
+@router.post("/recurring", response_model=BookingBatchResponse)
+async def create_recurring_bookings(
+    recurrence: BookingRecurrenceCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Non autorisé")
+    if recurrence.occurrences > MAX_BATCH_SLOTS:
+        raise HTTPException(status_code=400, detail=f"Une série ne peut pas dépasser {MAX_BATCH_SLOTS} créneaux")
+
+    step = timedelta(days=recurrence.interval_days)
+    slots = [
+        BookingCreate(
+            user_id=recurrence.user_id,
+            car_id=recurrence.car_id,
+            start_time=recurrence.start_time + occurrence * step,
+            end_time=recurrence.end_time + occurrence * step,
+            purpose=recurrence.purpose,
+        )
+        for occurrence in range(recurrence.occurrences)
+    ]
+    return await run_idempotent(
+        idempotency_key, _idempotency_scope(current_user, "bookings/recurring"), recurrence,
+        lambda: _create_bookings(db, slots), BookingBatchResponse,
+    )
+
+# Récupérer toutes les réservations (paginées, filtrables)
 @router.get("/", response_model=List[BookingResponse])
-async def get_all_bookings(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def get_all_bookings(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    car_id: Optional[int] = None,
+    status: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
     if not current_user:
         raise HTTPException(status_code=401, detail="Non autorisé")
-    result = await db.execute(select(Booking))
-    bookings = result.scalars().all()
-    return bookings
 
-# Récupérer les réservations par user_id
-@router.get("/user")
+    stmt = select(Booking)
+    if car_id is not None:
+        stmt = stmt.where(Booking.car_id == car_id)
+    if status is not None:
+        stmt = stmt.where(Booking.status == status)
+    # Réservations qui chevauchent la période [start, end), résolues par l'index
+    # (end_time, start_time) avant la pagination par id
+    period = []
+    if start is not None:
+        period.append(Booking.end_time > start)
+    if end is not None:
+        period.append(Booking.start_time < end)
+    if period:
+        stmt = stmt.where(Booking.id.in_(select(Booking.id).where(*period)))
+
+    result = await db.execute(paginate(stmt, Booking.id, limit, after))
+    return page_items(result.scalars().all(), limit, response)
+
+# Colonnes strictement nécessaires au fil des réservations d'un utilisateur
+def _feed_columns(source) -> tuple:
+    # source : Booking (table chaude) ou BookingHistory (réservations archivées)
+    return (
+        source.id,
+        source.user_id,
+        source.car_id,
+        source.start_time,
+        source.end_time,
+        source.purpose,
+        source.status,
+        source.created_at,
+        source.updated_at,
+        Car.nom.label("car_nom"),
+        Car.modele.label("car_modele"),
+        Car.annee_fab.label("car_annee_fab"),
+        Car.type.label("car_type"),
+        Car.plaque.label("car_plaque"),
+        Car.controle_technique.label("car_controle_technique"),
+        Car.prix_par_heure.label("car_prix_par_heure"),
+        Car.disponible.label("car_disponible"),
+        Car.image_url.label("car_image_url"),
+    )
+
+
+FEED_COLUMNS = _feed_columns(Booking)
+
+
+def _feed_item(row) -> dict:
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "car_id": row.car_id,
+        "start_time": row.start_time,
+        "end_time": row.end_time,
+        "purpose": row.purpose,
+        "status": row.status,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+        "car": {
+            "id": row.car_id,
+            "nom": row.car_nom,
+            "modele": row.car_modele,
+            "annee_fab": row.car_annee_fab,
+            "type": row.car_type,
+            "plaque": row.car_plaque,
+            "controle_technique": row.car_controle_technique,
+            "prix_par_heure": float(row.car_prix_par_heure),
+            "disponible": row.car_disponible,
+            "image_url": row.car_image_url,
+        },
+    }
+
+# Récupérer les réservations de l'utilisateur connecté, avec leur voiture
+@router.get("/user", response_model=List[UserBookingResponse])
 async def get_bookings_by_user(
+    upcoming_only: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_archived: bool = True,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -61,47 +348,129 @@ async def get_bookings_by_user(
     if isinstance(current_user, dict):
         current_user = User(**current_user)
 
-    # Jointure entre Booking et Car pour obtenir plus d'infos
-    result = await db.execute(
-        select(Booking, Car)
-        .join(Car, Booking.car_id == Car.id)
-        .filter(Booking.user_id == current_user.id)
-    )
+    def feed_query(source):
+        stmt = (
+            select(*_feed_columns(source))
+            .join(Car, source.car_id == Car.id)
+            .where(source.user_id == current_user.id)
+        )
+        if upcoming_only:
+            stmt = stmt.where(source.end_time > datetime.utcnow())
+        if start is not None:
+            stmt = stmt.where(source.end_time > start)
+        if end is not None:
+            stmt = stmt.where(source.start_time < end)
+        return stmt
 
-    bookings = result.all()
-
-    print(bookings)
-
-    # Transformation des résultats en un format plus complet
-    bookings_list = [
-        {
-            "id": booking.Booking.id,
-            "user_id": booking.Booking.user_id,
-            "car_id": booking.Booking.car_id,
-            "start_time": booking.Booking.start_time,
-            "end_time": booking.Booking.end_time,
-            "purpose": booking.Booking.purpose,
-            "status": booking.Booking.status,
-            "created_at": booking.Booking.created_at,
-            "updated_at": booking.Booking.updated_at,
-            "car": {  # Ajout des infos de la voiture
-                "id": booking.Car.id,
-                "nom": booking.Car.nom,
-                "modele": booking.Car.modele,
-                "annee_fab": booking.Car.annee_fab,
-                "type": booking.Car.type,
-                "plaque": booking.Car.plaque,
-                "controle_technique": booking.Car.controle_technique,
-                "prix_par_heure": booking.Car.prix_par_heure,
-                "disponible": booking.Car.disponible,
-                "image_url": booking.Car.image_url,
-            }
-        }
-        for booking in bookings
-    ]
+    # Les réservations archivées sont toutes passées : inutile de les lire pour upcoming_only
+    if upcoming_only or not include_archived:
+        stmt = feed_query(Booking).order_by(Booking.start_time)
+    else:
+        feed = union_all(feed_query(Booking), feed_query(BookingHistory)).subquery()
+        stmt = select(feed).order_by(feed.c.start_time)
+
+    result = await db.execute(stmt)
+    # Lignes déjà au format du schéma : sérialisation directe par orjson, sans validation Pydantic
+    return ORJSONResponse([_feed_item(row) for row in result])
+
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_COLUMNS = [
+    "id", "user_id", "car_id", "start_time", "end_time", "status", "purpose", "prix_par_heure", "price",
+]
 
 
-    return bookings_list
+def _export_row(row) -> dict:
+    hours = Decimal((row.end_time - row.start_time).total_seconds()) / Decimal(3600)
+    if row.prix_par_heure is None:
+        # Réservation archivée d'une voiture supprimée depuis : plus de tarif connu
+        prix_par_heure = price = ""
+    else:
+        prix_par_heure = Decimal(row.prix_par_heure)
+        price = (hours * prix_par_heure).quantize(Decimal("0.01"))
+    return {
+        "id": row.id,
+        "user_id": row.user_id,
+        "car_id": row.car_id,
+        "start_time": row.start_time.isoformat(),
+        "end_time": row.end_time.isoformat(),
+        "status": row.status,
+        "purpose": row.purpose,
+        "prix_par_heure": str(prix_par_heure),
+        "price": str(price),
+    }
+
+
+def _format_chunk(rows, export_format: str) -> str:
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+        writer.writerows(_export_row(row) for row in rows)
+        return buffer.getvalue()
+    return "".join(json.dumps(_export_row(row)) + "\n" for row in rows)
+
+
+# Exporter l'historique des réservations (flux NDJSON ou CSV, mémoire constante)
+@router.get("/export")
+async def export_bookings(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    car_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    include_archived: bool = True,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    if not current_user:
+        raise HTTPException(status_code=401, detail="Non autorisé")
+
+    def export_query(source):
+        # Jointure externe : les réservations archivées peuvent viser une voiture supprimée
+        stmt = select(
+            source.id,
+            source.user_id,
+            source.car_id,
+            source.start_time,
+            source.end_time,
+            source.status,
+            source.purpose,
+            Car.prix_par_heure,
+        ).outerjoin(Car, source.car_id == Car.id)
+        if car_id is not None:
+            stmt = stmt.where(source.car_id == car_id)
+        if start is not None:
+            stmt = stmt.where(source.end_time > start)
+        if end is not None:
+            stmt = stmt.where(source.start_time < end)
+        return stmt
+
+    if include_archived:
+        rows = union_all(export_query(Booking), export_query(BookingHistory)).subquery()
+        stmt = select(rows).order_by(rows.c.id)
+    else:
+        stmt = export_query(Booking).order_by(Booking.id)
+    stmt = stmt.execution_options(yield_per=EXPORT_CHUNK_SIZE)
+
+    # Connexion dédiée au flux : elle vit aussi longtemps que la réponse, indépendamment
+    # de la session de la requête. Les lignes arrivent par lots via un curseur serveur.
+    engine = db.bind
+
+    async def generate():
+        if export_format == "csv":
+            yield ",".join(EXPORT_COLUMNS) + "\r\n"
+        async with engine.connect() as conn:
+            result = await conn.stream(stmt)
+            async for rows in result.partitions(EXPORT_CHUNK_SIZE):
+                yield _format_chunk(rows, export_format)
+
+    if export_format == "csv":
+        media_type, extension = "text/csv", "csv"
+    else:
+        media_type, extension = "application/x-ndjson", "ndjson"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="bookings.{extension}"'},
+    )
 
 # Récupérer une réservation par ID
 @router.get("/{booking_id}", response_model=BookingResponse)
@@ -114,6 +483,9 @@ async def get_booking(booking_id: int, db: AsyncSession = Depends(get_db), curre
 
     result = await db.execute(select(Booking).filter(Booking.id == booking_id))
     booking = result.scalars().first()
+    if not booking:
+        # Réservation terminée ou annulée déjà archivée : même identifiant dans bookings_history
+        booking = await db.get(BookingHistory, booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Réservation non trouvée")
     return booking
@@ -133,12 +505,45 @@ async def update_booking(booking_id: int, booking_update: BookingUpdate, db: Asy
     if booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Accès interdit")
 
-    for key, value in booking_update.dict(exclude_unset=True).items():
-        setattr(booking, key, value)
+    changes = booking_update.dict(exclude_unset=True)
+    target_car_id = changes.get("car_id", booking.car_id)
+    if target_car_id != booking.car_id and await db.get(Car, target_car_id) is None:
+        raise HTTPException(status_code=404, detail="Voiture non trouvée")
 
-    booking.updated_at = datetime.utcnow()
-    await db.commit()
-    await db.refresh(booking)
+    previous_period = (booking.car_id, booking.start_time, booking.end_time)
+    previous_facts = booking_facts(booking)
+    async with AsyncExitStack() as stack:
+        # Voiture d'origine et voiture cible d'un déplacement, dans un ordre fixe (pas d'interblocage)
+        for car_id in sorted({booking.car_id, target_car_id}):
+            await stack.enter_async_context(car_lock(db, car_id))
+        for key, value in changes.items():
+            setattr(booking, key, value)
+
+        if not _is_valid_period(booking.start_time, booking.end_time):
+            raise HTTPException(status_code=400, detail=INVALID_PERIOD_DETAIL)
+        active = booking.status == ACTIVE_BOOKING_STATUS
+        if active and await booking_index.confirm_conflict(
+            db, booking.car_id, booking.start_time, booking.end_time, exclude_id=booking.id
+        ) is not None:
+            raise HTTPException(status_code=400, detail=BOOKING_CONFLICT_DETAIL)
+
+        booking.updated_at = datetime.utcnow()
+        try:
+            await apply_rollup_delta(db, removed=[previous_facts], added=[booking_facts(booking)])
+            await refresh_user_summary(db, booking.user_id, removed=[previous_facts], added=[booking_facts(booking)])
+            await db.commit()
+        except IntegrityError as exc:
+            if is_overlap_violation(exc):
+                raise HTTPException(status_code=400, detail=BOOKING_CONFLICT_DETAIL)
+            raise
+        await db.refresh(booking)
+        # Une réservation annulée ou terminée libère son créneau
+        if active:
+            booking_index.add(booking.id, booking.car_id, booking.start_time, booking.end_time)
+        else:
+            booking_index.remove(booking.id)
+    await _after_booking_change(previous_period, (booking.car_id, booking.start_time, booking.end_time))
+    await _publish_booking("booking.cancelled" if booking.status == "annulée" else "booking.updated", booking)
     return booking
 
 # Supprimer une réservation
@@ -157,6 +562,12 @@ async def delete_booking(booking_id: int, db: AsyncSession = Depends(get_db), cu
     if booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Accès interdit")
 
+    period = (booking.car_id, booking.start_time, booking.end_time)
+    await apply_rollup_delta(db, removed=[booking_facts(booking)])
     await db.delete(booking)
+    await refresh_user_summary(db, booking.user_id, removed=[booking_facts(booking)])
     await db.commit()
+    booking_index.remove(booking_id)
+    await _after_booking_change(period)
+    await _publish_booking("booking.deleted", booking)
     return {"message": "Réservation supprimée avec succès"}
\ No newline at end of file
@@ -1,13 +1,76 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy import exists, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import aliased
 from database import get_db
+from models.booking import Booking, is_active
 from models.car import Car
-from schemas.car import CarCreate, CarResponse, CarUpdate
-from datetime import date
+from schemas.car import (
+    CarAvailabilityResponse,
+    CarBulkError,
+    CarBulkImportResponse,
+    CarCreate,
+    CarOccupancyResponse,
+    CarResponse,
+    CarSlotSuggestion,
+    CarUpdate,
+)
+from utils.cache import build_cache
+from utils.events import publish_event
+from utils.occupancy import GRANULARITIES, MAX_OCCUPANCY_DAYS, MINUTES_PER_DAY, load_occupancy, to_bitmap, to_runs
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate
+from datetime import date, datetime, timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple
+import csv
+import hashlib
+import io
+import itertools
 
 router = APIRouter(prefix="/cars", tags=["Cars"])
 
+# controle_technique est la date du dernier contrôle, valable deux ans
+CONTROLE_TECHNIQUE_VALIDITE = timedelta(days=730)
+SUGGESTION_HORIZON = timedelta(days=7)
+MAX_SUGGESTIONS = 5
+# Lignes insérées par requête INSERT ... RETURNING lors d'un import en masse
+BULK_CHUNK_SIZE = 1000
+
+# Catalogue lu en continu par le tableau de bord, modifié rarement : on garde le JSON
+# déjà sérialisé. Les fiches sont invalidées une à une, les pages de liste via un
+# numéro de génération incrémenté à chaque modification.
+car_cache = build_cache("cars")
+LIST_GENERATION_KEY = "list:generation"
+
+
+def _car_key(car_id: int) -> str:
+    return f"car:{car_id}"
+
+
+def _serialize_car(car: Car) -> bytes:
+    return CarResponse.from_orm(car).json().encode()
+
+
+def _pack_page(etag: str, next_cursor: Optional[int], body: bytes) -> bytes:
+    return f"{etag}\n{next_cursor or ''}\n".encode() + body
+
+
+def _unpack_page(value: bytes):
+    etag, next_cursor, body = value.split(b"\n", 2)
+    return etag.decode(), next_cursor.decode() or None, body
+
+
+async def invalidate_car(car_id: Optional[int] = None):
+    """Après chaque modification du catalogue : purge le cache et prévient les clients de /events."""
+    if car_id is not None:
+        await car_cache.delete(_car_key(car_id))
+    await car_cache.incr(LIST_GENERATION_KEY)
+    # car_id absent : plusieurs voitures ajoutées (création, import)
+    await publish_event("car.changed", {"car_id": car_id})
+
 @router.post("/", response_model=CarResponse)
 async def create_car(car: CarCreate, db: AsyncSession = Depends(get_db)):
     new_car = Car(
@@ -23,21 +86,283 @@ async def create_car(car: CarCreate, db: AsyncSession = Depends(get_db)):
     db.add(new_car)
     await db.commit()
     await db.refresh(new_car)
+    await invalidate_car()
     return new_car
 
+def _csv_rows(file) -> Iterator[dict]:
+    # Lecture ligne à ligne du fichier envoyé : il n'est jamais chargé en entier
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    for row in reader:
+        yield {key.strip(): value.strip() for key, value in row.items() if key and value}
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+    )
+
+
+async def _import_chunk(
+    db: AsyncSession,
+    chunk: List[Tuple[int, object]],
+    seen_plaques: set,
+    report: CarBulkImportResponse,
+):
+    valid: List[Tuple[int, CarCreate]] = []
+    for row_number, raw in chunk:
+        if not isinstance(raw, dict):
+            report.errors.append(CarBulkError(row=row_number, detail="Objet voiture attendu"))
+            continue
+        try:
+            car = CarCreate(**raw)
+        except ValidationError as exc:
+            report.errors.append(CarBulkError(row=row_number, plaque=raw.get("plaque"), detail=_validation_detail(exc)))
+            continue
+        if car.plaque in seen_plaques:
+            report.errors.append(CarBulkError(row=row_number, plaque=car.plaque, detail="Plaque en double dans l'import"))
+            continue
+        seen_plaques.add(car.plaque)
+        valid.append((row_number, car))
+    if not valid:
+        return
+
+    # Une seule requête pour toutes les plaques du lot déjà enregistrées
+    result = await db.execute(select(Car.plaque).where(Car.plaque.in_([car.plaque for _, car in valid])))
+    existing = set(result.scalars().all())
+    rows = []
+    for row_number, car in valid:
+        if car.plaque in existing:
+            report.errors.append(CarBulkError(row=row_number, plaque=car.plaque, detail="Plaque déjà enregistrée"))
+        else:
+            rows.append((row_number, car))
+    if not rows:
+        return
+
+    try:
+        result = await db.execute(
+            insert(Car).values([car.dict() for _, car in rows]).returning(Car.id)
+        )
+        ids = result.scalars().all()
+        await db.commit()
+    except IntegrityError:
+        # Plaque insérée entre-temps par une autre requête : le lot entier est annulé
+        await db.rollback()
+        report.errors.extend(
+            CarBulkError(row=row_number, plaque=car.plaque, detail="Conflit à l'insertion, lot annulé")
+            for row_number, car in rows
+        )
+        return
+    report.ids.extend(ids)
+    report.created += len(ids)
+
+
+async def _import_cars(db: AsyncSession, rows: Iterable[object]) -> CarBulkImportResponse:
+    report = CarBulkImportResponse(created=0, ids=[], errors=[])
+    seen_plaques = set()
+    numbered = enumerate(rows, start=1)
+    while True:
+        chunk = list(itertools.islice(numbered, BULK_CHUNK_SIZE))
+        if not chunk:
+            break
+        await _import_chunk(db, chunk, seen_plaques, report)
+    report.errors.sort(key=lambda error: error.row)
+    if report.created:
+        await invalidate_car()
+    return report
+
+
+@router.post("/bulk", response_model=CarBulkImportResponse)
+async def import_cars(request: Request, db: AsyncSession = Depends(get_db)):
+    """Import en masse : tableau JSON de voitures ou fichier CSV (champ `file`, en-tête = champs de CarCreate).
+
+    Les lignes valides sont insérées par lots de BULK_CHUNK_SIZE, les autres
+    sont rapportées avec leur numéro de ligne.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Fichier CSV attendu dans le champ 'file'")
+        try:
+            return await _import_cars(db, _csv_rows(upload.file))
+        except (UnicodeDecodeError, csv.Error) as exc:
+            raise HTTPException(status_code=400, detail=f"CSV illisible : {exc}")
+        finally:
+            await upload.close()
+
+    try:
+        payload = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Corps JSON invalide")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=400, detail="Un tableau de voitures est attendu")
+    return await _import_cars(db, payload)
+
+def _suggest_free_slots(busy_bookings, start: datetime, duration: timedelta, horizon_end: datetime):
+    """Premier créneau libre de `duration` à partir de `start`, pour chaque voiture occupée.
+
+    `busy_bookings` est trié par (car_id, start_time).
+    """
+    suggestions = {}
+    cursor = {}
+    for car_id, booking_start, booking_end in busy_bookings:
+        if car_id in suggestions:
+            continue
+        candidate = cursor.get(car_id, start)
+        if booking_start >= candidate + duration:
+            suggestions[car_id] = candidate
+        else:
+            cursor[car_id] = max(candidate, booking_end)
+    # Voitures dont toutes les réservations de l'horizon sont passées : libres juste après la dernière
+    for car_id, candidate in cursor.items():
+        if car_id not in suggestions and candidate + duration <= horizon_end:
+            suggestions[car_id] = candidate
+    return sorted(
+        (
+            CarSlotSuggestion(car_id=car_id, start_time=slot_start, end_time=slot_start + duration)
+            for car_id, slot_start in suggestions.items()
+        ),
+        key=lambda suggestion: (suggestion.start_time, suggestion.car_id),
+    )[:MAX_SUGGESTIONS]
+
+# Voitures libres sur un créneau
+@router.get("/available", response_model=CarAvailabilityResponse)
+async def get_available_cars(
+    start: datetime,
+    end: datetime,
+    car_type: Optional[str] = Query(None, alias="type"),
+    suggest: bool = False,
+    db: AsyncSession = Depends(get_db),
+):
+    if end <= start:
+        raise HTTPException(status_code=400, detail="La fin du créneau doit être postérieure à son début")
+
+    eligible = [
+        Car.disponible.isnot(False),
+        Car.controle_technique > end.date() - CONTROLE_TECHNIQUE_VALIDITE,
+    ]
+    if car_type:
+        eligible.append(Car.type == car_type)
+    other = aliased(Booking)
+    overlapping = exists().where(
+        other.car_id == Car.id,
+        is_active(other),
+        other.end_time > start,
+        other.start_time < end,
+    )
+
+    # Anti-jointure : une seule requête, servie par l'index partiel des réservations actives
+    result = await db.execute(select(Car).where(*eligible, ~overlapping).order_by(Car.id))
+    cars = result.scalars().all()
+
+    suggestions = []
+    if suggest:
+        horizon_end = start + SUGGESTION_HORIZON
+        busy_result = await db.execute(
+            select(Booking.car_id, Booking.start_time, Booking.end_time)
+            .join(Car, Booking.car_id == Car.id)
+            .where(
+                *eligible,
+                overlapping,
+                is_active(),
+                Booking.end_time > start,
+                Booking.start_time < horizon_end,
+            )
+            .order_by(Booking.car_id, Booking.start_time)
+        )
+        suggestions = _suggest_free_slots(busy_result.all(), start, end - start, horizon_end)
+
+    return CarAvailabilityResponse(cars=cars, suggestions=suggestions)
+
+# Planning d'occupation de la flotte
+@router.get("/occupancy", response_model=CarOccupancyResponse)
+async def get_occupancy(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    granularity: str = Query("15m", pattern="^(5m|15m|30m|1h)$"),
+    output_format: str = Query("intervals", alias="format", pattern="^(intervals|bitmap)$"),
+    car_type: Optional[str] = Query(None, alias="type"),
+    db: AsyncSession = Depends(get_db),
+):
+    """Créneaux occupés de chaque voiture sur [from, to), jours UTC."""
+    if end <= start:
+        raise HTTPException(status_code=400, detail="La date de fin doit être postérieure à la date de début")
+    if (end - start).days > MAX_OCCUPANCY_DAYS:
+        raise HTTPException(status_code=400, detail=f"Période limitée à {MAX_OCCUPANCY_DAYS} jours")
+
+    stmt = select(Car.id).order_by(Car.id)
+    if car_type is not None:
+        stmt = stmt.where(Car.type == car_type)
+    car_ids = (await db.execute(stmt)).scalars().all()
+    occupancy = await load_occupancy(db, car_ids, start, end)
+
+    step = GRANULARITIES[granularity]
+    days = [start + timedelta(days=offset) for offset in range((end - start).days)]
+    cars = []
+    for car_id in car_ids:
+        day_intervals = [occupancy[(car_id, day)] for day in days]
+        if output_format == "bitmap":
+            cars.append({"car_id": car_id, "bitmaps": [format(to_bitmap(intervals, step), "x") for intervals in day_intervals]})
+        else:
+            cars.append({"car_id": car_id, "intervals": to_runs(day_intervals, step)})
+    return ORJSONResponse({
+        "start": start,
+        "end": end,
+        "granularity": granularity,
+        "slots_per_day": MINUTES_PER_DAY // step,
+        "cars": cars,
+    })
+
 @router.get("/{car_id}", response_model=CarResponse)
 async def get_car(car_id: int, db: AsyncSession = Depends(get_db)):
+    cached = await car_cache.get(_car_key(car_id))
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
     result = await db.execute(select(Car).filter(Car.id == car_id))
     car = result.scalar()
     if not car:
         raise HTTPException(status_code=404, detail="Voiture non trouvée")
-    return car
+    body = _serialize_car(car)
+    await car_cache.set(_car_key(car_id), body)
+    return Response(content=body, media_type="application/json")
 
 @router.get("/", response_model=list[CarResponse])
-async def get_all_cars(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(Car))
-    cars = result.scalars().all()
-    return cars
+async def get_all_cars(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    car_type: Optional[str] = Query(None, alias="type"),
+    disponible: Optional[bool] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    generation = int(await car_cache.get(LIST_GENERATION_KEY) or 0)
+    page_key = f"list:{generation}:{car_type}:{disponible}:{limit}:{after}"
+    cached = await car_cache.get(page_key)
+    if cached is not None:
+        etag, next_cursor, body = _unpack_page(cached)
+    else:
+        stmt = select(Car)
+        if car_type is not None:
+            stmt = stmt.where(Car.type == car_type)
+        if disponible is not None:
+            stmt = stmt.where(Car.disponible.is_(disponible))
+        result = await db.execute(paginate(stmt, Car.id, limit, after))
+        rows = result.scalars().all()
+        cars = rows[:limit]
+        next_cursor = str(cars[-1].id) if len(rows) > limit else None
+        body = b"[" + b",".join(_serialize_car(car) for car in cars) + b"]"
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        await car_cache.set(page_key, _pack_page(etag, next_cursor, body))
+
+    headers = {"ETag": etag}
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    # Catalogue inchangé : 304 sans corps ni requête SQL
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.put("/{car_id}", response_model=CarResponse)
 async def update_car(car_id: int, car: CarUpdate, db: AsyncSession = Depends(get_db)):
@@ -46,12 +371,13 @@ async def update_car(car_id: int, car: CarUpdate, db: AsyncSession = Depends(get
     if not existing_car:
         raise HTTPException(status_code=404, detail="Voiture non trouvée")
 
-    for key, value in car.model_dump(exclude_unset=True).items():
+    for key, value in car.dict(exclude_unset=True).items():
         setattr(existing_car, key, value)
 
     existing_car.updated_at = date.today()
     await db.commit()
     await db.refresh(existing_car)
+    await invalidate_car(car_id)
     return existing_car
 
 @router.delete("/{car_id}")
@@ -63,4 +389,5 @@ async def delete_car(car_id: int, db: AsyncSession = Depends(get_db)):
 
     await db.delete(car)
     await db.commit()
+    await invalidate_car(car_id)
     return {"message": "Voiture supprimée"}
\ No newline at end of file
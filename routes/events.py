@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from config import settings
+from models.user import User
+from routes.auth import get_current_user
+from utils.events import event_broker
+import asyncio
+import json
+
+router = APIRouter(tags=["Événements"])
+
+
+async def event_stream(queue: asyncio.Queue, user_id: int, heartbeat_seconds: float):
+    """Trames SSE des événements publics et de ceux destinés à `user_id`."""
+    yield ": connected\n\n"
+    while True:
+        try:
+            event = await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+        except asyncio.TimeoutError:
+            # Commentaire SSE : garde la connexion ouverte derrière les proxys
+            yield ": ping\n\n"
+            continue
+        if event.get("user_id") not in (None, user_id):
+            continue
+        yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+# Flux Server-Sent Events : réservations de l'utilisateur et changements de la flotte
+@router.get("/events")
+async def stream_events(current_user: User = Depends(get_current_user)):
+    if isinstance(current_user, dict):
+        current_user = User(**current_user)
+    user_id = current_user.id
+
+    async def generate():
+        # L'abonnement vit aussi longtemps que la connexion ; Starlette annule le générateur à la déconnexion
+        async with event_broker.subscribe() as queue:
+            async for frame in event_stream(queue, user_id, settings.events_heartbeat_seconds):
+                yield frame
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from database import pool_status
+from utils.metrics import metrics
+from utils.rate_limit import rate_limiter
+from utils.token_cache import token_cache
+
+router = APIRouter(tags=["Monitoring"])
+
+# Exposition au format texte Prometheus (un scrape par worker)
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    gauges = {f"car2go_token_cache_{key}": value for key, value in token_cache.stats().items()}
+    gauges.update({
+        f"car2go_db_pool_{key}": value
+        for key, value in pool_status().items()
+        if isinstance(value, (int, float))
+    })
+    gauges.update({f"car2go_rate_limit_{key}": value for key, value in rate_limiter.stats().items()})
+    return metrics.render(gauges)
@@ -1,15 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from routes.auth import get_current_user
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from database import get_db
 from models.user import User
-from schemas.user import UserCreate, UserResponse, UserUpdate
-from passlib.context import CryptContext
+from schemas.user import NextBookingSummary, UserCreate, UserResponse, UserSummaryResponse, UserUpdate
 from utils.logger import logger
+from utils.password import password_hasher
+from utils.token_cache import token_cache
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, paginate, page_items
+from utils.user_summary import get_user_summary
+from typing import Optional
 
 router = APIRouter(prefix="/users", tags=["Users"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 @router.post("/", response_model=UserCreate)
 async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
@@ -23,7 +26,7 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     if user.role == "apprenti" and not user.numero_livret:
         raise HTTPException(status_code=400, detail="Un apprenti doit avoir un numéro de livret.")
 
-    hashed_password = pwd_context.hash(user.password)
+    hashed_password = await password_hasher.hash(user.password)
     new_user = User(
         nom=user.nom,
         prenom=user.prenom,
@@ -42,6 +45,28 @@ async def create_user(user: UserCreate, db: AsyncSession = Depends(get_db)):
     await db.refresh(new_user)
     return new_user
 
+# Résumé pour l'en-tête du tableau de bord (déclaré avant /{user_id})
+@router.get("/me/summary", response_model=UserSummaryResponse)
+async def get_my_summary(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    if isinstance(current_user, dict):
+        current_user = User(**current_user)
+
+    summary = await get_user_summary(db, current_user.id)
+    next_booking = None
+    if summary.next_booking_id is not None:
+        next_booking = NextBookingSummary(
+            id=summary.next_booking_id,
+            car_id=summary.next_car_id,
+            start_time=summary.next_start_time,
+            end_time=summary.next_end_time,
+        )
+    return UserSummaryResponse(
+        user_id=current_user.id,
+        hours_driven=round(summary.driven_minutes / 60, 2),
+        upcoming_count=summary.upcoming_count,
+        next_booking=next_booking,
+    )
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(user_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     result = await db.execute(select(User).filter(User.id == user_id))
@@ -52,10 +77,19 @@ async def get_user(user_id: int, db: AsyncSession = Depends(get_db), current_use
     return user
 
 @router.get("/", response_model=list[UserResponse])
-async def get_all_users(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
+async def get_all_users(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[int] = None,
+    role: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    stmt = select(User)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    result = await db.execute(paginate(stmt, User.id, limit, after))
+    return page_items(result.scalars().all(), limit, response)
 
 @router.put("/{user_id}", response_model=UserResponse)
 async def update_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
@@ -72,14 +106,17 @@ async def update_user(user_id: int, user: UserUpdate, db: AsyncSession = Depends
         logger.error(f"User {user_id} n'existe pas endpoint: update_user")
         raise HTTPException(status_code=403, detail="Accès interdit")
 
-    for key, value in user.model_dump().items():
+    for key, value in user.dict(exclude_unset=True).items():
         if value is not None:
+            if key == "password":
+                value = await password_hasher.hash(value)
             setattr(existing_user, key, value)
 
     await db.commit()
+    token_cache.invalidate_user(user_id)
     return existing_user
 
-@router.delete("/{user_id}", response_model=UserResponse)
+@router.delete("/{user_id}")
 async def delete_user(user_id: int, db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
     result = await db.execute(select(User).filter(User.id == user_id))
     user = result.scalar()
@@ -95,4 +132,5 @@ async def delete_user(user_id: int, db: AsyncSession = Depends(get_db), current_
 
     await db.delete(user)
     await db.commit()
+    token_cache.invalidate_user(user_id)
     return {"message": "Utilisateur supprimé"}
\ No newline at end of file
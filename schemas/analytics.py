@@ -0,0 +1,31 @@
+from pydantic import BaseModel
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+class AnalyticsRow(BaseModel):
+    # Identifiant du groupe : id de voiture ou d'accompagnateur, type, jour ou lundi de la semaine
+    key: str
+    label: Optional[str] = None
+    bookings: int
+    booked_hours: float
+
+class UtilizationRow(AnalyticsRow):
+    # Part du temps de la flotte réservée (non définie par accompagnateur)
+    utilization: Optional[float] = None
+
+class RevenueRow(AnalyticsRow):
+    revenue: Decimal
+
+class UtilizationResponse(BaseModel):
+    start: date
+    end: date
+    group_by: str
+    rows: List[UtilizationRow]
+
+class RevenueResponse(BaseModel):
+    start: date
+    end: date
+    group_by: str
+    total: Decimal
+    rows: List[RevenueRow]
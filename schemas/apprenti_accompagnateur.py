@@ -1,12 +1,25 @@
 from pydantic import BaseModel
+from typing import Optional
 
 class ApprentiAccompagnateurCreate(BaseModel):
     apprenti_id: int
     accompagnateur_id: int
     lien: str
 
+class AssociatedUser(BaseModel):
+    id: int
+    nom: str
+    prenom: str
+    email: str
+    telephone: str
+
+    class Config:
+        orm_mode = True
+
 class ApprentiAccompagnateurResponse(ApprentiAccompagnateurCreate):
     id: int
+    apprenti: Optional[AssociatedUser] = None
+    accompagnateur: Optional[AssociatedUser] = None
 
     class Config:
         orm_mode = True
\ No newline at end of file
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from datetime import datetime
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 class BookingBase(BaseModel):
     user_id: int
@@ -13,6 +13,8 @@ class BookingCreate(BookingBase):
     pass
 
 class BookingUpdate(BaseModel):
+    # Déplacer la réservation sur une autre voiture
+    car_id: Optional[int] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
     status: Optional[str] = Field(None, pattern="^(confirmée|annulée|terminée)$")
@@ -28,4 +30,48 @@ class BookingResponse(BookingBase):
     updated_at: datetime
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class BookingBatchCreate(BaseModel):
+    bookings: List[BookingCreate]
+
+class BookingRecurrenceCreate(BookingBase):
+    # start_time / end_time décrivent le premier créneau, répété tous les `interval_days` jours
+    interval_days: int = Field(7, ge=1)
+    occurrences: int = Field(..., ge=1)
+
+class BookingSlotConflict(BaseModel):
+    index: int
+    car_id: int
+    start_time: datetime
+    end_time: datetime
+    detail: str
+
+class BookingBatchResponse(BaseModel):
+    created: List[BookingResponse]
+    conflicts: List[BookingSlotConflict]
+
+
+class BookingCarSummary(BaseModel):
+    id: int
+    nom: str
+    modele: str
+    annee_fab: int
+    type: str
+    plaque: str
+    controle_technique: date
+    prix_par_heure: float
+    disponible: Optional[bool] = None
+    image_url: Optional[str] = None
+
+class UserBookingResponse(BaseModel):
+    id: int
+    user_id: int
+    car_id: int
+    start_time: datetime
+    end_time: datetime
+    purpose: str
+    status: str
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    car: BookingCarSummary
@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import List, Optional
 
 class CarBase(BaseModel):
     nom: str
@@ -39,3 +39,40 @@ class CarResponse(CarBase):
 
     class Config:
         from_attributes = True
+        orm_mode = True
+
+
+class CarSlotSuggestion(BaseModel):
+    car_id: int
+    start_time: datetime
+    end_time: datetime
+
+class CarAvailabilityResponse(BaseModel):
+    cars: List[CarResponse]
+    # Prochains créneaux libres de même durée pour les voitures occupées (si suggest=true)
+    suggestions: List[CarSlotSuggestion] = []
+
+class CarBulkError(BaseModel):
+    # Numéro de ligne dans le fichier importé (1 = première voiture)
+    row: int
+    plaque: Optional[str] = None
+    detail: str
+
+class CarBulkImportResponse(BaseModel):
+    created: int
+    ids: List[int]
+    errors: List[CarBulkError]
+
+class CarOccupancy(BaseModel):
+    car_id: int
+    # format=intervals : plages [début, fin) de créneaux occupés, numérotés depuis `from`
+    intervals: Optional[List[List[int]]] = None
+    # format=bitmap : un entier hexadécimal par jour, bit de poids faible = premier créneau
+    bitmaps: Optional[List[str]] = None
+
+class CarOccupancyResponse(BaseModel):
+    start: date
+    end: date
+    granularity: str
+    slots_per_day: int
+    cars: List[CarOccupancy]
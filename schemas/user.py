@@ -1,6 +1,6 @@
 from typing import Optional
 from pydantic import BaseModel, EmailStr
-from datetime import date
+from datetime import date, datetime
 
 class UserBase(BaseModel):
     nom: str
@@ -36,4 +36,18 @@ class UserResponse(UserBase):
 
     class Config:
         from_attributes = True
+        orm_mode = True
 
+
+class NextBookingSummary(BaseModel):
+    id: int
+    car_id: int
+    start_time: datetime
+    end_time: datetime
+
+class UserSummaryResponse(BaseModel):
+    user_id: int
+    hours_driven: float
+    # Réservations confirmées en cours ou à venir
+    upcoming_count: int
+    next_booking: Optional[NextBookingSummary] = None
@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta
+
+
+def test_recurring_bookings_report_conflicts_per_slot(client):
+    c, user_id, car_ids = client
+    first_start = datetime(2030, 1, 8, 18, 0)
+
+    # Un créneau déjà pris la troisième semaine
+    taken = first_start + timedelta(weeks=2, minutes=30)
+    response = c.post("/bookings/", json={
+        "user_id": user_id,
+        "car_id": car_ids[0],
+        "start_time": taken.isoformat(),
+        "end_time": (taken + timedelta(hours=1)).isoformat(),
+        "purpose": "self",
+    })
+    assert response.status_code == 200
+
+    response = c.post("/bookings/recurring", json={
+        "user_id": user_id,
+        "car_id": car_ids[0],
+        "start_time": first_start.isoformat(),
+        "end_time": (first_start + timedelta(hours=1)).isoformat(),
+        "purpose": "accompanied",
+        "occurrences": 10,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["created"]) == 9
+    assert [conflict["index"] for conflict in body["conflicts"]] == [2]
+
+
+def test_batch_detects_overlaps_inside_the_batch(client):
+    c, user_id, car_ids = client
+    start = datetime(2030, 1, 9, 9, 0)
+
+    def slot(car_id, offset_minutes):
+        slot_start = start + timedelta(minutes=offset_minutes)
+        return {
+            "user_id": user_id,
+            "car_id": car_id,
+            "start_time": slot_start.isoformat(),
+            "end_time": (slot_start + timedelta(hours=1)).isoformat(),
+            "purpose": "self",
+        }
+
+    response = c.post("/bookings/batch", json={
+        "bookings": [slot(car_ids[0], 0), slot(car_ids[0], 30), slot(car_ids[1], 30), slot(car_ids[0], 60)],
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert [booking["car_id"] for booking in body["created"]] == [car_ids[0], car_ids[1], car_ids[0]]
+    assert [conflict["index"] for conflict in body["conflicts"]] == [1]
+
+
+def test_batch_mixing_aware_and_naive_datetimes(client):
+    c, user_id, car_ids = client
+
+    def slot(start, end):
+        return {"user_id": user_id, "car_id": car_ids[0], "start_time": start, "end_time": end, "purpose": "self"}
+
+    response = c.post("/bookings/batch", json={"bookings": [
+        slot("2030-05-01T10:00:00", "2030-05-01T11:00:00"),
+        # 12:00-13:00 UTC
+        slot("2030-05-01T14:00:00+02:00", "2030-05-01T15:00:00+02:00"),
+        # 10:30 UTC : chevauche le premier créneau une fois ramené en UTC
+        slot("2030-05-01T10:30:00Z", "2030-05-01T10:45:00Z"),
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [(booking["start_time"], booking["end_time"]) for booking in body["created"]] == [
+        ("2030-05-01T10:00:00", "2030-05-01T11:00:00"),
+        ("2030-05-01T12:00:00", "2030-05-01T13:00:00"),
+    ]
+    assert [conflict["index"] for conflict in body["conflicts"]] == [2]
@@ -0,0 +1,22 @@
+from datetime import datetime, timedelta
+
+from utils.booking_index import BookingIntervalIndex
+
+
+def test_index_detects_overlaps_and_tracks_updates():
+    index = BookingIntervalIndex()
+    start = datetime(2025, 1, 6, 10, 0)
+
+    index.add(1, car_id=1, start_time=start, end_time=start + timedelta(hours=1))
+    index.add(2, car_id=1, start_time=start + timedelta(hours=2), end_time=start + timedelta(hours=3))
+
+    assert index.find_conflict(1, start + timedelta(minutes=30), start + timedelta(minutes=90)) == 1
+    assert index.find_conflict(1, start + timedelta(hours=1), start + timedelta(hours=2)) is None
+    assert index.find_conflict(2, start, start + timedelta(hours=1)) is None
+    assert index.find_conflict(1, start, start + timedelta(hours=1), exclude_id=1) is None
+
+    index.add(1, car_id=1, start_time=start + timedelta(hours=4), end_time=start + timedelta(hours=5))
+    assert index.find_conflict(1, start, start + timedelta(hours=1)) is None
+
+    index.remove(2)
+    assert index.find_conflict(1, start + timedelta(hours=2), start + timedelta(hours=3)) is None
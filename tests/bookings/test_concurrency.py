@@ -0,0 +1,91 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from utils.booking_index import booking_index
+
+
+def _payload(user_id, car_id, start, end):
+    return {
+        "user_id": user_id,
+        "car_id": car_id,
+        "start_time": start.isoformat(),
+        "end_time": end.isoformat(),
+        "purpose": "self",
+    }
+
+
+def test_parallel_overlapping_bookings_only_one_wins(client):
+    c, user_id, car_ids = client
+    start = datetime(2030, 1, 7, 10, 0)
+
+    payloads = [
+        _payload(user_id, car_ids[i % 2], start + timedelta(minutes=i % 30), start + timedelta(hours=1, minutes=i % 30))
+        for i in range(200)
+    ]
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        responses = list(pool.map(lambda p: c.post("/bookings/", json=p), payloads))
+
+    statuses = [r.status_code for r in responses]
+    # Une seule réservation gagnante par voiture, toutes les autres sont refusées proprement
+    assert statuses.count(200) == 2
+    assert statuses.count(400) == 198
+    assert {r.json()["detail"] for r in responses if r.status_code == 400} == {
+        "Car is already booked for the selected time range"
+    }
+
+
+def test_database_constraint_rejects_overlap_missed_by_index(client):
+    c, user_id, car_ids = client
+    start = datetime(2030, 1, 7, 10, 0)
+
+    assert c.post("/bookings/", json=_payload(user_id, car_ids[0], start, start + timedelta(hours=1))).status_code == 200
+
+    # Simule un index périmé (réservation faite par un autre worker)
+    booking_index.clear()
+    response = c.post(
+        "/bookings/",
+        json=_payload(user_id, car_ids[0], start + timedelta(minutes=30), start + timedelta(hours=2)),
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Car is already booked for the selected time range"
+
+
+def test_stale_index_entry_does_not_reject_free_slot(client):
+    c, user_id, car_ids = client
+    start = datetime(2030, 1, 7, 10, 0)
+
+    # Créneau encore présent dans l'index alors qu'un autre worker l'a supprimé
+    booking_index.add(999999, car_ids[0], start, start + timedelta(hours=1))
+    response = c.post("/bookings/", json=_payload(user_id, car_ids[0], start, start + timedelta(hours=1)))
+    assert response.status_code == 200
+    assert booking_index.find_conflict(car_ids[0], start, start + timedelta(hours=1)) == response.json()["id"]
+
+
+def test_car_locks_are_dropped_once_released(client):
+    from utils.booking_lock import _car_locks
+
+    c, user_id, car_ids = client
+    start = datetime(2030, 1, 9, 10, 0)
+    assert c.post("/bookings/", json=_payload(user_id, car_ids[1], start, start + timedelta(hours=1))).status_code == 200
+    assert _car_locks == {}
+
+
+def test_moving_a_booking_to_another_car_checks_the_target_car(client):
+    c, user_id, car_ids = client
+    start = datetime(2030, 1, 10, 10, 0)
+    end = start + timedelta(hours=1)
+
+    assert c.post("/bookings/", json=_payload(user_id, car_ids[0], start, end)).status_code == 200
+    moved = c.post("/bookings/", json=_payload(user_id, car_ids[1], start, end)).json()["id"]
+
+    response = c.put(f"/bookings/{moved}", json={"car_id": car_ids[0]})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Car is already booked for the selected time range"
+    assert c.get(f"/bookings/{moved}").json()["car_id"] == car_ids[1]
+
+    # Créneau libre sur la voiture cible : le déplacement libère la voiture d'origine
+    later = {"car_id": car_ids[0], "start_time": (start + timedelta(hours=2)).isoformat(), "end_time": (end + timedelta(hours=2)).isoformat()}
+    assert c.put(f"/bookings/{moved}", json=later).status_code == 200
+    assert booking_index.find_conflict(car_ids[0], start + timedelta(hours=2), end + timedelta(hours=2)) == moved
+    assert c.post("/bookings/", json=_payload(user_id, car_ids[1], start, end)).status_code == 200
+    assert c.put(f"/bookings/{moved}", json={"car_id": 999}).status_code == 404
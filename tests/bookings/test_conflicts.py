@@ -107,3 +107,39 @@ def test_overlapping_booking_rejected(client):
     assert response2.status_code == 400
     assert response2.json()["detail"] == "Car is already booked for the selected time range"
 
+
+
+def test_empty_or_inverted_period_rejected_on_create(client):
+    c, user, car = client
+    start = datetime(2030, 2, 1, 10, 0)
+
+    for end in (start, start - timedelta(hours=1)):
+        response = c.post("/bookings/", json={
+            "user_id": user.id,
+            "car_id": car.id,
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat(),
+            "purpose": "self",
+        })
+        assert response.status_code == 400
+        assert response.json()["detail"] == "La fin du créneau doit être postérieure à son début"
+    assert c.get("/bookings/").json() == []
+
+
+def test_empty_or_inverted_period_rejected_on_update(client):
+    c, user, car = client
+    start = datetime(2030, 2, 1, 10, 0)
+    response = c.post("/bookings/", json={
+        "user_id": user.id,
+        "car_id": car.id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "purpose": "self",
+    })
+    booking_id = response.json()["id"]
+
+    for end in (start, start - timedelta(hours=1)):
+        response = c.put(f"/bookings/{booking_id}", json={"end_time": end.isoformat()})
+        assert response.status_code == 400
+        assert response.json()["detail"] == "La fin du créneau doit être postérieure à son début"
+    assert c.get(f"/bookings/{booking_id}").json()["end_time"] == (start + timedelta(hours=1)).isoformat()
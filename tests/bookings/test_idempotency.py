@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from utils.auth import ACCESS_TOKEN_EXPIRE_MINUTES
+from utils.idempotency import IDEMPOTENT_REPLAY_HEADER, idempotency_store
+
+
+def test_retried_booking_is_replayed_without_running_again(client):
+    c, user_id, car_ids = client
+    start = datetime(2030, 3, 1, 10, 0)
+    payload = {
+        "user_id": user_id,
+        "car_id": car_ids[0],
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "purpose": "self",
+    }
+    headers = {"Idempotency-Key": "retry-1"}
+
+    first = c.post("/bookings/", json=payload, headers=headers)
+    assert first.status_code == 200
+    # Sans rejeu, le second envoi serait un conflit (400)
+    retry = c.post("/bookings/", json=payload, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers[IDEMPOTENT_REPLAY_HEADER] == "true"
+
+    # Nouvelle clé : la requête est exécutée et son erreur est elle aussi rejouée
+    conflict = c.post("/bookings/", json=payload, headers={"Idempotency-Key": "retry-2"})
+    assert conflict.status_code == 400
+    c.delete(f"/bookings/{first.json()['id']}")
+    replayed = c.post("/bookings/", json=payload, headers={"Idempotency-Key": "retry-2"})
+    assert replayed.status_code == 400
+    assert replayed.json() == conflict.json()
+
+    other_body = dict(payload, car_id=car_ids[1])
+    assert c.post("/bookings/", json=other_body, headers=headers).status_code == 422
+
+
+def test_retried_batch_creates_slots_once(client):
+    c, user_id, car_ids = client
+    start = datetime(2030, 3, 2, 10, 0)
+    batch = {"bookings": [{
+        "user_id": user_id,
+        "car_id": car_id,
+        "start_time": start.isoformat(),
+        "end_time": (start + timedelta(hours=1)).isoformat(),
+        "purpose": "self",
+    } for car_id in car_ids[:2]]}
+
+    responses = [c.post("/bookings/batch", json=batch, headers={"Idempotency-Key": "batch-1"}) for _ in range(2)]
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[0].json() == responses[1].json()
+    assert len(responses[1].json()["created"]) == 2
+    assert len(c.get("/bookings/").json()) == 2
+
+
+def test_register_replays_are_scoped_by_email_and_expire_with_the_token(client, monkeypatch):
+    c, _, _ = client
+    ttls = []
+    store_set = idempotency_store.set
+
+    async def recording_set(key, value, ttl=None):
+        ttls.append(ttl)
+        await store_set(key, value, ttl)
+
+    monkeypatch.setattr(idempotency_store, "set", recording_set)
+
+    def register(email):
+        return c.post("/auth/register", json={
+            "nom": "Nouveau",
+            "prenom": "Client",
+            "email": email,
+            "telephone": "0600000000",
+            "adresse": "1 rue",
+            "date_naissance": "2000-01-01",
+            "role": "apprenti",
+            "numero_livret": "LIV-1",
+            "password": "secret",
+        }, headers={"Idempotency-Key": "signup"})
+
+    first = register("a@example.com")
+    assert first.status_code == 200
+    replay = register("a@example.com")
+    assert replay.headers[IDEMPOTENT_REPLAY_HEADER] == "true"
+    assert replay.json() == first.json()
+
+    # Même clé, autre client anonyme : traité comme une nouvelle requête, pas un rejeu ni un 422
+    other = register("b@example.com")
+    assert other.status_code == 200
+    assert IDEMPOTENT_REPLAY_HEADER not in other.headers
+    assert other.json()["access_token"] != first.json()["access_token"]
+
+    # Le jeton rejoué ne survit pas à sa propre expiration
+    assert ttls == [ACCESS_TOKEN_EXPIRE_MINUTES * 60] * 2
@@ -0,0 +1,66 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy.future import select
+
+from database import get_db
+from main import app
+from models.booking import BookingHistory
+from utils.booking_lifecycle import archive_bookings, finalize_ended_bookings
+
+
+def run_with_session(job):
+    async def run():
+        async for db in app.dependency_overrides[get_db]():
+            return await job(db)
+
+    return asyncio.run(run())
+
+
+def test_cancelled_slot_is_freed_then_bookings_are_finalized_and_archived(client):
+    c, user_id, car_ids = client
+    now = datetime.utcnow().replace(microsecond=0)
+
+    def book(start, hours=1):
+        return c.post("/bookings/", json={
+            "user_id": user_id,
+            "car_id": car_ids[0],
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=hours)).isoformat(),
+            "purpose": "self",
+        })
+
+    ended = book(now - timedelta(days=2)).json()["id"]
+    upcoming = book(now + timedelta(days=1)).json()["id"]
+    assert book(now + timedelta(days=1)).status_code == 400
+
+    # Une réservation annulée ne bloque plus son créneau
+    assert c.put(f"/bookings/{upcoming}", json={"status": "annulée"}).status_code == 200
+    rebooked = book(now + timedelta(days=1))
+    assert rebooked.status_code == 200
+
+    finalized = run_with_session(lambda db: finalize_ended_bookings(db, now, batch_size=1))
+    assert finalized == [ended]
+    assert c.get(f"/bookings/{ended}").json()["status"] == "terminée"
+
+    # Réactiver l'annulation entrerait en conflit avec la nouvelle réservation
+    assert c.put(f"/bookings/{upcoming}", json={"status": "confirmée"}).status_code == 400
+
+    archived = run_with_session(lambda db: archive_bookings(db, now + timedelta(days=2), batch_size=1))
+    assert archived == 2
+    history = run_with_session(lambda db: db.execute(select(BookingHistory.id, BookingHistory.status)))
+    assert sorted(history.all()) == [(ended, "terminée"), (upcoming, "annulée")]
+    assert c.get(f"/bookings/{rebooked.json()['id']}").status_code == 200
+
+    # Les lectures d'historique incluent les réservations archivées, sauf demande contraire
+    assert c.get(f"/bookings/{ended}").json()["status"] == "terminée"
+    feed = c.get("/bookings/user").json()
+    # upcoming et rebooked ont le même début : seul l'ordre par rapport à ended est fixé
+    assert feed[0]["id"] == ended
+    assert sorted(booking["id"] for booking in feed) == sorted([ended, upcoming, rebooked.json()["id"]])
+    assert [booking["id"] for booking in c.get("/bookings/user", params={"include_archived": False}).json()] == [
+        rebooked.json()["id"]
+    ]
+    exported = [line for line in c.get("/bookings/export").text.splitlines() if line]
+    assert len(exported) == 3
+    assert len(c.get("/bookings/export", params={"include_archived": False}).text.splitlines()) == 1
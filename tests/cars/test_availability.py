@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from database import get_db
+from main import app
+from utils.booking_lifecycle import archive_bookings
+
+
+def run_with_session(job):
+    async def run():
+        async for db in app.dependency_overrides[get_db]():
+            return await job(db)
+
+    return asyncio.run(run())
+
+
+def test_available_cars_exclude_only_confirmed_overlaps(client):
+    c, user_id, car_ids = client
+    base = (datetime.utcnow() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def book(car_id, start_hour, end_hour):
+        response = c.post("/bookings/", json={
+            "user_id": user_id,
+            "car_id": car_id,
+            "start_time": (base + timedelta(hours=start_hour)).isoformat(),
+            "end_time": (base + timedelta(hours=end_hour)).isoformat(),
+            "purpose": "self",
+        })
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    def available(start_hour, end_hour):
+        response = c.get("/cars/available", params={
+            "start": (base + timedelta(hours=start_hour)).isoformat(),
+            "end": (base + timedelta(hours=end_hour)).isoformat(),
+        })
+        assert response.status_code == 200
+        return [car["id"] for car in response.json()["cars"]]
+
+    # Aucune réservation : toute la flotte est libre
+    assert available(0, 2) == car_ids
+
+    book(car_ids[0], 0, 2)
+    assert available(1, 3) == [car_ids[1]]
+    # Intervalles semi-ouverts : finir au début de la réservation, ou commencer à sa fin, ne la chevauche pas
+    assert available(-2, 0) == car_ids
+    assert available(2, 4) == car_ids
+
+    # Une réservation annulée, puis archivée, ne bloque plus la voiture
+    cancelled = book(car_ids[1], 4, 6)
+    assert available(4, 5) == [car_ids[0]]
+    assert c.put(f"/bookings/{cancelled}", json={"status": "annulée"}).status_code == 200
+    assert available(4, 5) == car_ids
+    archived = run_with_session(lambda db: archive_bookings(db, base + timedelta(days=1), batch_size=10))
+    assert archived == 1
+    assert c.get(f"/bookings/{cancelled}").json()["status"] == "annulée"
+    assert available(4, 5) == car_ids
+
+    response = c.get("/cars/available", params={"start": base.isoformat(), "end": base.isoformat()})
+    assert response.status_code == 400
+
+
+def test_suggestions_are_sorted_by_earliest_free_slot(client):
+    c, user_id, car_ids = client
+    base = (datetime.utcnow() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    def book(car_id, start_hour, end_hour):
+        response = c.post("/bookings/", json={
+            "user_id": user_id,
+            "car_id": car_id,
+            "start_time": (base + timedelta(hours=start_hour)).isoformat(),
+            "end_time": (base + timedelta(hours=end_hour)).isoformat(),
+            "purpose": "self",
+        })
+        assert response.status_code == 200
+
+    book(car_ids[0], 0, 4)
+    book(car_ids[1], -1, 1)
+    # Le créneau libre qui suit la première réservation est trop court pour une heure
+    book(car_ids[1], 1.5, 3)
+
+    response = c.get("/cars/available", params={
+        "start": base.isoformat(),
+        "end": (base + timedelta(hours=1)).isoformat(),
+        "suggest": True,
+    })
+    assert response.status_code == 200
+    body = response.json()
+    assert body["cars"] == []
+    assert [
+        (suggestion["car_id"], suggestion["start_time"], suggestion["end_time"])
+        for suggestion in body["suggestions"]
+    ] == [
+        (car_ids[1], (base + timedelta(hours=3)).isoformat(), (base + timedelta(hours=4)).isoformat()),
+        (car_ids[0], (base + timedelta(hours=4)).isoformat(), (base + timedelta(hours=5)).isoformat()),
+    ]
@@ -0,0 +1,41 @@
+def test_bulk_import_json_reports_row_errors(client):
+    c, user_id, car_ids = client
+    car = {
+        "nom": "Import",
+        "modele": "Model",
+        "annee_fab": 2023,
+        "type": "classique",
+        "controle_technique": "2026-01-01",
+    }
+
+    response = c.post("/cars/bulk", json=[
+        {**car, "plaque": "IM-001-AA"},
+        {**car, "plaque": "AB-000-CD"},  # déjà en base
+        {**car, "plaque": "IM-001-AA"},  # en double dans l'import
+        {**car, "plaque": "IM-002-AA", "annee_fab": "inconnue"},
+        {**car, "plaque": "IM-003-AA"},
+    ])
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 2
+    assert [(error["row"], error["plaque"]) for error in body["errors"]] == [
+        (2, "AB-000-CD"),
+        (3, "IM-001-AA"),
+        (4, "IM-002-AA"),
+    ]
+    assert [c.get(f"/cars/{car_id}").json()["plaque"] for car_id in body["ids"]] == ["IM-001-AA", "IM-003-AA"]
+    assert len(c.get("/cars/").json()) == 4
+
+
+def test_bulk_import_csv_upload(client):
+    c, user_id, car_ids = client
+    lines = ["nom,modele,annee_fab,type,plaque,controle_technique"]
+    lines += [f"Csv,Model,2022,double commande,CS-{i:04d}-AA,2026-01-01" for i in range(1500)]
+    lines.append("Csv,Model,2022,double commande,,2026-01-01")
+
+    response = c.post("/cars/bulk", files={"file": ("flotte.csv", "\n".join(lines).encode(), "text/csv")})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["created"] == 1500
+    assert [error["row"] for error in body["errors"]] == [1501]
+    assert "plaque" in body["errors"][0]["detail"]
@@ -0,0 +1,63 @@
+import asyncio
+
+from utils.cache import LRUCache
+
+
+def test_catalog_etag_and_invalidation(client):
+    c, user_id, car_ids = client
+
+    first = c.get("/cars/")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    # Catalogue inchangé : 304 servi depuis le cache
+    assert c.get("/cars/", headers={"If-None-Match": etag}).status_code == 304
+    assert c.get(f"/cars/{car_ids[0]}").json()["nom"] == "Car 0"
+
+    response = c.post("/cars/", json={
+        "nom": "Nouvelle",
+        "modele": "Model",
+        "annee_fab": 2024,
+        "type": "double commande",
+        "plaque": "ZZ-999-ZZ",
+        "controle_technique": "2026-01-01",
+    })
+    assert response.status_code == 200
+    refreshed = c.get("/cars/", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert [car["nom"] for car in refreshed.json()] == ["Car 0", "Car 1", "Nouvelle"]
+
+    assert c.delete(f"/cars/{car_ids[0]}").status_code == 200
+    assert c.get(f"/cars/{car_ids[0]}").status_code == 404
+
+
+def test_car_update_evicts_list_and_detail(client):
+    c, user_id, car_ids = client
+
+    etag = c.get("/cars/").headers["etag"]
+    assert c.get(f"/cars/{car_ids[0]}").json()["nom"] == "Car 0"
+
+    response = c.put(f"/cars/{car_ids[0]}", json={"nom": "Renommée"})
+    assert response.status_code == 200
+    assert response.json()["nom"] == "Renommée"
+
+    # Détail et liste relus en base, nouvel ETag
+    assert c.get(f"/cars/{car_ids[0]}").json()["nom"] == "Renommée"
+    refreshed = c.get("/cars/", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert [car["nom"] for car in refreshed.json()] == ["Renommée", "Car 1"]
+
+
+def test_generation_counter_survives_lru_eviction():
+    async def scenario():
+        cache = LRUCache(max_entries=2, ttl_seconds=60)
+        assert await cache.incr("list:generation") == 1
+        # Trafic GET /cars/{id} : de nombreuses entrées chassent les plus anciennes
+        for car_id in range(10):
+            await cache.set(f"car:{car_id}", b"{}")
+        assert await cache.get("list:generation") == b"1"
+        assert await cache.incr("list:generation") == 2
+
+    asyncio.run(scenario())
@@ -0,0 +1,32 @@
+def test_occupancy_runs_bitmaps_and_invalidation(client):
+    c, user_id, car_ids = client
+
+    def book(start, end):
+        response = c.post("/bookings/", json={
+            "user_id": user_id,
+            "car_id": car_ids[0],
+            "start_time": start,
+            "end_time": end,
+            "purpose": "self",
+        })
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    book("2030-03-04T10:00:00", "2030-03-04T11:20:00")
+    overnight = book("2030-03-04T23:30:00", "2030-03-05T01:00:00")
+    params = {"from": "2030-03-04", "to": "2030-03-06", "granularity": "15m"}
+
+    body = c.get("/cars/occupancy", params=params).json()
+    assert body["slots_per_day"] == 96
+    # Créneau entamé = occupé ; la réservation de nuit forme une seule plage sur deux jours
+    assert body["cars"] == [
+        {"car_id": car_ids[0], "intervals": [[40, 46], [94, 100]]},
+        {"car_id": car_ids[1], "intervals": []},
+    ]
+
+    bitmaps = c.get("/cars/occupancy", params={**params, "format": "bitmap"}).json()["cars"][0]["bitmaps"]
+    assert [int(bitmap, 16) for bitmap in bitmaps] == [(0b111111 << 40) | (0b11 << 94), 0b1111]
+
+    assert c.delete(f"/bookings/{overnight}").status_code == 200
+    body = c.get("/cars/occupancy", params=params).json()
+    assert body["cars"][0]["intervals"] == [[40, 46]]
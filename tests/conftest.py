@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import settings
+from database import Base, get_db
+from main import app
+from models.user import User
+from models.car import Car
+from routes.auth import get_current_user
+from routes.car import car_cache
+from utils.idempotency import idempotency_store
+from utils.occupancy import occupancy_cache
+from utils.rate_limit import rate_limiter
+from utils.token_cache import token_cache
+
+
+@pytest.fixture(autouse=True)
+def no_background_lifecycle(monkeypatch):
+    # La tâche de fond viserait settings.database_url, pas la base du test (seul get_db est remplacé)
+    monkeypatch.setattr(settings, "booking_lifecycle_in_app", False)
+
+
+@pytest.fixture(autouse=True)
+def no_rate_limit(monkeypatch):
+    # Les tests de charge (concurrence, imports) ne doivent pas être limités ; test_rate_limit.py le réactive
+    monkeypatch.setattr(rate_limiter, "enabled", False)
+
+
+@pytest.fixture
+def client(tmp_path):
+    # Base fichier : chaque requête concurrente a sa propre connexion
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'car2go.db'}", future=True)
+    async_session = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+
+    async def init_db():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        async with async_session() as session:
+            user = User(
+                nom="Test",
+                prenom="User",
+                email="test@example.com",
+                password="hashed",
+                telephone="1234567890",
+                adresse="123 Street",
+                date_naissance=datetime(1990, 1, 1).date(),
+                role="apprenti",
+                numero_livret="ABC123",
+            )
+            cars = [
+                Car(
+                    nom=f"Car {i}",
+                    modele="Model",
+                    annee_fab=2020,
+                    type="classique",
+                    plaque=f"AB-{i:03d}-CD",
+                    controle_technique=datetime.utcnow().date(),
+                    prix_par_heure=20.0,
+                    disponible=True,
+                )
+                for i in range(2)
+            ]
+            session.add_all([user, *cars])
+            await session.commit()
+            return user.id, [car.id for car in cars]
+
+    user_id, car_ids = asyncio.run(init_db())
+    asyncio.run(car_cache.clear())
+    asyncio.run(occupancy_cache.clear())
+    asyncio.run(idempotency_store.clear())
+    asyncio.run(rate_limiter.store.clear())
+    token_cache.clear()
+
+    async def override_get_db():
+        async with async_session() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: {"id": user_id, "role": "apprenti"}
+
+    with TestClient(app) as c:
+        yield c, user_id, car_ids
+
+    app.dependency_overrides.clear()
+    asyncio.run(engine.dispose())
@@ -0,0 +1,91 @@
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+
+from utils.rollups import minutes_by_day
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_rollups_follow_booking_mutations(client):
+    c, user_id, car_ids = client
+
+    def book(car_id, start, end):
+        response = c.post("/bookings/", json={
+            "user_id": user_id,
+            "car_id": car_id,
+            "start_time": start,
+            "end_time": end,
+            "purpose": "self",
+        })
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    book(car_ids[0], "2030-03-04T22:00:00", "2030-03-05T02:00:00")
+    moved = book(car_ids[1], "2030-03-06T10:00:00", "2030-03-06T11:00:00")
+    cancelled = book(car_ids[1], "2030-03-07T10:00:00", "2030-03-07T12:00:00")
+    assert c.put(f"/bookings/{moved}", json={"end_time": "2030-03-06T13:00:00"}).status_code == 200
+    assert c.put(f"/bookings/{cancelled}", json={"status": "annulée"}).status_code == 200
+    params = {"from": "2030-03-04", "to": "2030-03-06"}
+
+    utilization = c.get("/analytics/utilization", params=params).json()["rows"]
+    # Réservation de nuit : 2 h le 4, 2 h le 5, sur 2 jours de 24 h
+    assert [(row["key"], row["booked_hours"], row["bookings"], row["utilization"]) for row in utilization] == [
+        (str(car_ids[0]), 4.0, 1, round(4 / 48, 4)),
+    ]
+
+    revenue = c.get("/analytics/revenue", params={"from": "2030-03-01", "to": "2030-04-01", "group_by": "type"}).json()
+    assert [(row["key"], row["bookings"], row["booked_hours"]) for row in revenue["rows"]] == [("classique", 2, 7.0)]
+    # 7 h au tarif de 20 €/h
+    assert Decimal(str(revenue["rows"][0]["revenue"])) == Decimal(str(revenue["total"])) == Decimal("140")
+
+    weekly = c.get("/analytics/utilization", params={"from": "2030-03-04", "to": "2030-03-11", "group_by": "week"})
+    assert [(row["key"], row["booked_hours"]) for row in weekly.json()["rows"]] == [("2030-03-04", 7.0)]
+
+    # Apprenti sans accompagnateur : aucun groupe
+    by_mentor = c.get("/analytics/revenue", params={**params, "group_by": "accompagnateur"})
+    assert by_mentor.status_code == 200 and by_mentor.json()["rows"] == []
+
+    assert c.delete(f"/bookings/{moved}").status_code == 200
+    day = c.get("/analytics/revenue", params={"from": "2030-03-06", "to": "2030-03-07", "group_by": "day"})
+    assert day.json()["rows"] == []
+
+
+def test_empty_or_inverted_periods_add_nothing_to_rollups():
+    start = datetime(2030, 3, 4, 22, 0)
+    assert minutes_by_day(start, datetime(2030, 3, 5, 2, 0)) == [(date(2030, 3, 4), 120), (date(2030, 3, 5), 120)]
+    assert minutes_by_day(start, start) == []
+    assert minutes_by_day(start, datetime(2030, 3, 4, 21, 0)) == []
+
+
+def test_migration_rebuilds_rollups_skewed_by_inverted_periods(tmp_path):
+    path = tmp_path / "rollups.db"
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "0008")
+
+    # État laissé par l'ancien calcul : la réservation inversée compte pour -60 min et une réservation
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO bookings (id, user_id, car_id, start_time, end_time, status, purpose) VALUES (?, 1, 1, ?, ?, ?, 'self')",
+            [
+                (1, "2030-03-04 12:00:00.000000", "2030-03-04 13:00:00.000000", "confirmée"),
+                (2, "2030-03-04 10:00:00.000000", "2030-03-04 09:00:00.000000", "terminée"),
+                (3, "2030-03-05 10:00:00.000000", "2030-03-05 11:30:00.000000", "confirmée"),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO booking_daily_rollups (day, car_id, user_id, booked_minutes, bookings) VALUES (?, 1, 1, ?, ?)",
+            [("2030-03-04", 0, 2), ("2030-03-05", 90, 1)],
+        )
+
+    command.upgrade(config, "head")
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute("SELECT day, booked_minutes, bookings FROM booking_daily_rollups ORDER BY day").fetchall()
+    assert rows == [("2030-03-04", 60, 1), ("2030-03-05", 90, 1)]
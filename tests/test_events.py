@@ -0,0 +1,55 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from routes.events import event_stream
+from utils.events import InMemoryBroker, event_broker
+
+
+def test_stream_filters_private_events_and_sends_heartbeats():
+    async def scenario():
+        broker = InMemoryBroker(queue_size=2)
+        async with broker.subscribe() as queue:
+            stream = event_stream(queue, user_id=1, heartbeat_seconds=0.05)
+            assert await stream.__anext__() == ": connected\n\n"
+            await broker.publish({"type": "booking.created", "data": {"id": 7}, "user_id": 2})
+            await broker.publish({"type": "booking.created", "data": {"id": 8}, "user_id": 1})
+            frame = await stream.__anext__()
+            assert frame.startswith("event: booking.created\n") and '"id": 8' in frame
+            assert await stream.__anext__() == ": ping\n\n"
+            # File pleine : l'événement le plus ancien est perdu
+            for booking_id in range(3):
+                await broker.publish({"type": "car.changed", "data": {"car_id": booking_id}})
+            assert broker.dropped == 1
+            assert queue.get_nowait()["data"] == {"car_id": 1}
+            await stream.aclose()
+        assert broker.subscribers == 0
+
+    asyncio.run(scenario())
+
+
+def test_booking_mutations_publish_events(client):
+    c, user_id, car_ids = client
+    queue = asyncio.Queue(maxsize=100)
+    event_broker._subscribers.add(queue)
+    try:
+        start = datetime.utcnow().replace(microsecond=0) + timedelta(days=1)
+        response = c.post("/bookings/", json={
+            "user_id": user_id,
+            "car_id": car_ids[0],
+            "start_time": start.isoformat(),
+            "end_time": (start + timedelta(hours=1)).isoformat(),
+            "purpose": "self",
+        })
+        assert response.status_code == 200
+        booking_id = response.json()["id"]
+        assert c.put(f"/bookings/{booking_id}", json={"status": "annulée"}).status_code == 200
+    finally:
+        event_broker._subscribers.discard(queue)
+
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    private = [(event["type"], event["data"]["id"]) for event in events if "user_id" in event]
+    assert private == [("booking.created", booking_id), ("booking.cancelled", booking_id)]
+    assert all(event["user_id"] == user_id for event in events if "user_id" in event)
+    assert {event["data"]["car_id"] for event in events if event["type"] == "car.availability"} == {car_ids[0]}
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from starlette.requests import Request
+
+from main import log_requests
+from utils.logger import request_context
+from utils.metrics import RequestDBStats, current_db_stats
+
+
+def test_failed_statement_leaves_the_timing_stack_balanced():
+    engine = create_engine("sqlite://")
+    stats = RequestDBStats()
+    token = current_db_stats.set(stats)
+    try:
+        with engine.connect() as conn:
+            conn.exec_driver_sql("SELECT 1")
+            assert conn.info["query_start"] == []
+
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM missing_table")
+            assert conn.info["query_start"] == []
+
+            conn.exec_driver_sql("SELECT 1")
+            assert conn.info["query_start"] == []
+    finally:
+        current_db_stats.reset(token)
+        engine.dispose()
+    # La requête en échec compte aussi dans le temps passé en base
+    assert stats.queries == 3
+
+
+def test_request_context_is_reset_when_the_app_raises():
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+    async def failing_app(request):
+        raise RuntimeError("boom")
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await log_requests(request, failing_app)
+        # Rien ne fuit vers ce qui s'exécute ensuite sur la même tâche
+        assert request_context.get() is None
+        assert current_db_stats.get() is None
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.future import select
+
+from models.booking import Booking, is_active
+from models.car import Car
+from models.user import User
+from routes.booking import FEED_COLUMNS
+from utils.pagination import paginate
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def migrated_database(tmp_path) -> sqlite3.Connection:
+    path = tmp_path / "plans.db"
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    config.attributes["configure_logger"] = False
+    command.upgrade(config, "head")
+    return sqlite3.connect(path)
+
+
+def query_plan(conn, stmt) -> str:
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    return "\n".join(row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+
+
+def test_hot_booking_queries_use_indexes(tmp_path):
+    conn = migrated_database(tmp_path)
+    start, end = datetime(2025, 1, 6, 10), datetime(2025, 1, 6, 11)
+
+    conflict_plan = query_plan(conn, select(Booking.id).where(
+        Booking.car_id == 1,
+        is_active(),
+        Booking.end_time > start,
+        Booking.start_time < end,
+    ))
+    # Index partiel : seules les réservations actives y figurent
+    assert "ix_bookings_active_car_period" in conflict_plan
+    assert "SCAN bookings" not in conflict_plan
+
+    feed_plan = query_plan(
+        conn,
+        select(*FEED_COLUMNS)
+        .join(Car, Booking.car_id == Car.id)
+        .where(Booking.user_id == 1)
+        .order_by(Booking.start_time),
+    )
+    assert "ix_bookings_user_start" in feed_plan
+    assert "SCAN bookings" not in feed_plan
+    # L'index fournit déjà l'ordre : pas de tri temporaire
+    assert "TEMP B-TREE" not in feed_plan
+
+
+def test_filtered_keyset_pages_use_composite_indexes(tmp_path):
+    conn = migrated_database(tmp_path)
+    pages = [
+        ("ix_cars_type_id", paginate(select(Car).where(Car.type == "classique"), Car.id, 20, 100)),
+        ("ix_users_role_id", paginate(select(User).where(User.role == "apprenti"), User.id, 20, 100)),
+        ("ix_bookings_status_id", paginate(select(Booking).where(Booking.status == "annulée"), Booking.id, 20, 100)),
+    ]
+    for index_name, stmt in pages:
+        plan = query_plan(conn, stmt)
+        assert index_name in plan
+        # Filtre et ordre par id servis par le même index : ni tri temporaire ni parcours complet
+        assert "TEMP B-TREE" not in plan
+        assert "SCAN" not in plan
+
+
+def test_booking_list_filters_use_indexes(tmp_path):
+    conn = migrated_database(tmp_path)
+    start, end = datetime(2025, 1, 6), datetime(2025, 1, 13)
+
+    # Voiture peu réservée : l'index fournit filtre et ordre, sans parcourir la clé primaire
+    car_plan = query_plan(conn, paginate(select(Booking).where(Booking.car_id == 1), Booking.id, 20, 100))
+    assert "ix_bookings_car_id" in car_plan
+    assert "TEMP B-TREE" not in car_plan
+    assert "SCAN" not in car_plan
+
+    # Même requête que GET /bookings/?start=...&end=...
+    period = select(Booking.id).where(Booking.end_time > start, Booking.start_time < end)
+    period_plan = query_plan(conn, paginate(select(Booking).where(Booking.id.in_(period)), Booking.id, 20, None))
+    assert "ix_bookings_end_start" in period_plan
+    assert "SCAN" not in period_plan
@@ -0,0 +1,75 @@
+import asyncio
+
+from utils.auth import create_access_token
+from utils.rate_limit import EXPENSIVE, READ, RateLimitMiddleware, RateLimitPolicy, rate_limiter, route_class
+
+
+def test_route_classes():
+    assert route_class("POST", "/auth/login") == "auth"
+    assert route_class("GET", "/bookings/") == EXPENSIVE
+    assert route_class("GET", "/analytics/revenue") == EXPENSIVE
+    assert route_class("GET", "/bookings/12") == READ
+    assert route_class("PUT", "/bookings/12") == "write"
+    assert route_class("GET", "/metrics") is None
+
+
+def test_buckets_are_per_client_and_route_class(client, monkeypatch):
+    c, _, _ = client
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setitem(rate_limiter.policies, EXPENSIVE, RateLimitPolicy(per_minute=1, burst=2))
+
+    statuses = [c.get("/bookings/").status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
+    limited = c.get("/bookings/")
+    assert limited.status_code == 429
+    assert int(limited.headers["Retry-After"]) > 0
+
+    # Autre classe de route, autre client : seaux distincts
+    assert c.get("/cars/").status_code == 200
+    token = create_access_token({"sub": "other@example.com"})
+    assert c.get("/bookings/", headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+    assert "car2go_rate_limit_expensive_limited_total 2" in c.get("/metrics").text
+
+
+def test_expensive_routes_are_shed_over_concurrency_cap(client, monkeypatch):
+    c, _, _ = client
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "max_expensive_in_flight", 0)
+
+    response = c.get("/analytics/utilization", params={"from": "2030-01-01", "to": "2030-01-02"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert c.get("/cars/").status_code == 200
+
+
+def test_streamed_response_holds_its_concurrency_slot_until_the_end(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "enabled", True)
+    monkeypatch.setattr(rate_limiter, "expensive_in_flight", 0)
+    in_flight_while_streaming = []
+
+    async def export_app(scope, receive, send):
+        # Comme StreamingResponse : l'en-tête part d'abord, le corps ensuite par morceaux
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        for _ in range(3):
+            in_flight_while_streaming.append(rate_limiter.expensive_in_flight)
+            await send({"type": "http.response.body", "body": b"{}\n", "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def scenario():
+        scope = {
+            "type": "http", "method": "GET", "path": "/bookings/export", "query_string": b"",
+            "headers": [], "client": ("10.0.0.1", 1234),
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b""}
+
+        async def send(message):
+            await asyncio.sleep(0)
+
+        await RateLimitMiddleware(export_app)(scope, receive, send)
+
+    asyncio.run(scenario())
+    assert in_flight_while_streaming == [1, 1, 1]
+    assert rate_limiter.expensive_in_flight == 0
@@ -0,0 +1,67 @@
+import time
+
+from main import app
+from routes.auth import get_current_user
+from utils import token_cache as token_cache_module
+from utils.auth import create_access_token, verify_token
+from utils.token_cache import TokenCache, token_cache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+def test_entries_hit_miss_and_expire_with_the_token(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(token_cache_module, "time", clock)
+    cache = TokenCache(max_entries=10, ttl_seconds=300)
+    user = {"id": 1, "role": "apprenti"}
+
+    assert cache.get("jti-1") is None
+    cache.set("jti-1", user)
+    assert cache.get("jti-1") == user
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Le jeton expire avant le TTL du cache : l'entrée suit l'expiration du jeton
+    cache.set("jti-2", user, token_exp=clock.now + 60)
+    clock.now += 61
+    assert cache.get("jti-2") is None
+    assert cache.get("jti-1") == user
+
+    # Jeton déjà expiré : rien n'est mis en cache
+    cache.set("jti-3", user, token_exp=clock.now - 1)
+    assert cache.get("jti-3") is None
+    assert cache.stats()["size"] == 1
+
+
+def test_update_and_delete_evict_the_cached_user(client):
+    c, user_id, _ = client
+    # Authentification réelle par jeton, pour passer par le cache
+    del app.dependency_overrides[get_current_user]
+    token = create_access_token({"sub": "test@example.com"})
+    jti = verify_token(token)["jti"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert c.get(f"/users/{user_id}", headers=headers).status_code == 200
+    assert token_cache.get(jti)["nom"] == "Test"
+
+    # Profil modifié : les claims en cache sont relues en base à l'appel suivant
+    response = c.put(f"/users/{user_id}", json={"nom": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["prenom"] == "User"
+    assert token_cache.get(jti) is None
+    assert c.get(f"/users/{user_id}", headers=headers).status_code == 200
+    assert token_cache.get(jti)["nom"] == "Renamed"
+
+    assert c.delete(f"/users/{user_id}", headers=headers).status_code == 200
+    assert token_cache.get(jti) is None
+    # Jeton encore valide, mais l'utilisateur n'est plus servi depuis le cache
+    assert time.time() < verify_token(token)["exp"]
+    assert c.get(f"/users/{user_id}", headers=headers).status_code == 404
@@ -0,0 +1,46 @@
+import time
+from datetime import datetime, timedelta
+
+
+def test_summary_is_maintained_by_booking_mutations(client):
+    c, user_id, car_ids = client
+    now = datetime.utcnow().replace(microsecond=0)
+
+    def book(car_id, start, end):
+        response = c.post("/bookings/", json={
+            "user_id": user_id,
+            "car_id": car_id,
+            "start_time": start.isoformat(),
+            "end_time": end.isoformat(),
+            "purpose": "self",
+        })
+        assert response.status_code == 200
+        return response.json()["id"]
+
+    past = book(car_ids[0], now - timedelta(days=3), now - timedelta(days=3) + timedelta(hours=2))
+    later = book(car_ids[0], now + timedelta(days=2), now + timedelta(days=2, hours=1))
+    sooner = book(car_ids[1], now + timedelta(days=1), now + timedelta(days=1, hours=1))
+
+    summary = c.get("/users/me/summary").json()
+    assert summary["hours_driven"] == 2.0
+    assert summary["upcoming_count"] == 2
+    assert summary["next_booking"]["id"] == sooner
+
+    # Allonger une réservation passée corrige les heures déjà comptées
+    new_end = (now - timedelta(days=3) + timedelta(hours=3)).isoformat()
+    assert c.put(f"/bookings/{past}", json={"end_time": new_end}).status_code == 200
+    assert c.delete(f"/bookings/{sooner}").status_code == 200
+    summary = c.get("/users/me/summary").json()
+    assert summary["hours_driven"] == 3.0
+    assert summary["upcoming_count"] == 1
+    assert summary["next_booking"]["id"] == later
+
+    assert c.put(f"/bookings/{later}", json={"status": "annulée"}).status_code == 200
+    # Réservation en cours : comptée dans les heures une fois terminée, au prochain affichage
+    book(car_ids[1], now - timedelta(hours=1), datetime.utcnow() + timedelta(seconds=1))
+    assert c.get("/users/me/summary").json()["next_booking"] is not None
+    time.sleep(1.5)
+    summary = c.get("/users/me/summary").json()
+    assert summary["upcoming_count"] == 0
+    assert summary["next_booking"] is None
+    assert summary["hours_driven"] >= 4.0
@@ -1,22 +1,35 @@
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+from uuid import uuid4
 from config import settings
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    # Import différé : python-jose charge cryptography (~100 ms), inutile au démarrage
+    from jose import jwt
+
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": uuid4().hex})
     return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
 
 
+def user_claims(user) -> dict:
+    """Claims du jeton d'un utilisateur ; profil embarqué si jwt_embed_user_claims est actif."""
+    claims = {"sub": user.email}
+    if settings.jwt_embed_user_claims:
+        claims.update({"id": user.id, "role": user.role, "nom": user.nom, "prenom": user.prenom})
+    return claims
+
+
 def verify_token(token: str):
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
         return payload
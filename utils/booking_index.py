@@ -0,0 +1,149 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.booking import Booking, is_active
+
+# (start_time, end_time, booking_id)
+Interval = Tuple[datetime, datetime, int]
+
+
+def _naive_utc(value: datetime) -> datetime:
+    # Les colonnes DateTime sont stockées sans fuseau : on aligne les dates reçues de l'API.
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class BookingIntervalIndex:
+    """Index en mémoire des créneaux réservés, trié par voiture.
+
+    Les réservations d'une même voiture ne se chevauchent pas (c'est ce que la
+    vérification de conflit garantit), donc une liste triée par début suffit :
+    le seul créneau pouvant chevaucher [start, end) est celui qui commence juste
+    avant `end`. La base reste la source de vérité : cet index sert à rejeter
+    rapidement les conflits sans requête SQL.
+    """
+
+    def __init__(self):
+        self._starts: Dict[int, List[datetime]] = defaultdict(list)
+        self._intervals: Dict[int, List[Interval]] = defaultdict(list)
+        self._by_id: Dict[int, Tuple[int, datetime, datetime]] = {}
+
+    def clear(self):
+        self._starts.clear()
+        self._intervals.clear()
+        self._by_id.clear()
+
+    async def load(self, db: AsyncSession):
+        """Recharge l'index depuis la base (au démarrage) : réservations actives seulement."""
+        self.clear()
+        result = await db.execute(
+            select(Booking.id, Booking.car_id, Booking.start_time, Booking.end_time).where(is_active())
+        )
+        for booking_id, car_id, start_time, end_time in result.all():
+            self.add(booking_id, car_id, start_time, end_time)
+
+    async def reload_car(self, db: AsyncSession, car_id: int):
+        """Recharge les créneaux d'une seule voiture (index périmé par un autre worker)."""
+        for *_, booking_id in list(self._intervals.get(car_id, ())):
+            self.remove(booking_id)
+        result = await db.execute(
+            select(Booking.id, Booking.start_time, Booking.end_time)
+            .where(Booking.car_id == car_id, is_active())
+            .execution_options(autoflush=False)
+        )
+        for booking_id, start_time, end_time in result.all():
+            self.add(booking_id, car_id, start_time, end_time)
+
+    async def confirm_conflict(
+        self,
+        db: AsyncSession,
+        car_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """Comme find_conflict, mais un conflit trouvé dans l'index est vérifié en base.
+
+        L'index est propre au process : une réservation supprimée, annulée, déplacée
+        ou archivée par un autre worker y reste jusqu'au rechargement. Sans conflit
+        dans l'index, pas de requête (la contrainte d'exclusion couvre le cas inverse).
+        """
+        if self.find_conflict(car_id, start_time, end_time, exclude_id) is None:
+            return None
+        query = (
+            select(Booking.id)
+            .where(
+                Booking.car_id == car_id,
+                is_active(),
+                Booking.end_time > _naive_utc(start_time),
+                Booking.start_time < _naive_utc(end_time),
+            )
+            .limit(1)
+            # Ne pas envoyer la réservation en cours de modification avant la vérification
+            .execution_options(autoflush=False)
+        )
+        if exclude_id is not None:
+            query = query.where(Booking.id != exclude_id)
+        conflict_id = (await db.execute(query)).scalar_one_or_none()
+        if conflict_id is None:
+            await self.reload_car(db, car_id)
+        return conflict_id
+
+    def add(self, booking_id: int, car_id: int, start_time: datetime, end_time: datetime):
+        if booking_id in self._by_id:
+            self.remove(booking_id)
+        start_time, end_time = _naive_utc(start_time), _naive_utc(end_time)
+        interval = (start_time, end_time, booking_id)
+        intervals = self._intervals[car_id]
+        position = bisect_left(intervals, interval)
+        intervals.insert(position, interval)
+        self._starts[car_id].insert(position, start_time)
+        self._by_id[booking_id] = (car_id, start_time, end_time)
+
+    def remove(self, booking_id: int):
+        entry = self._by_id.pop(booking_id, None)
+        if entry is None:
+            return
+        car_id, start_time, end_time = entry
+        intervals = self._intervals[car_id]
+        position = bisect_left(intervals, (start_time, end_time, booking_id))
+        if position < len(intervals) and intervals[position][2] == booking_id:
+            del intervals[position]
+            del self._starts[car_id][position]
+        if not intervals:
+            del self._intervals[car_id]
+            del self._starts[car_id]
+
+    def find_conflict(
+        self,
+        car_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_id: Optional[int] = None,
+    ) -> Optional[int]:
+        """Retourne l'id d'une réservation chevauchant [start_time, end_time), sinon None."""
+        starts = self._starts.get(car_id)
+        if not starts:
+            return None
+        intervals = self._intervals[car_id]
+        start_time, end_time = _naive_utc(start_time), _naive_utc(end_time)
+        # Candidats : les créneaux qui commencent avant end_time, du plus proche au plus ancien.
+        position = bisect_left(starts, end_time) - 1
+        while position >= 0:
+            other_start, other_end, other_id = intervals[position]
+            if other_end > start_time and other_id != exclude_id:
+                return other_id
+            if other_id != exclude_id:
+                # Sans chevauchement entre créneaux existants, rien avant ne peut chevaucher.
+                return None
+            position -= 1
+        return None
+
+
+booking_index = BookingIntervalIndex()
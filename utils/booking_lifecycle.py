@@ -0,0 +1,126 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import delete, func, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from config import settings
+from database import SessionLocal, engine
+from models.booking import ACTIVE_BOOKING_STATUS, Booking, BookingHistory, is_active
+from utils.booking_index import booking_index
+from utils.booking_lock import ADVISORY_LOCK_NAMESPACE
+from utils.logger import logger
+from utils.user_summary import refresh_user_summary
+
+# Second argument du verrou consultatif de la passe (les verrous par voiture utilisent car_id > 0)
+LIFECYCLE_LOCK_ID = -1
+
+ARCHIVED_COLUMNS = ("id", "user_id", "car_id", "start_time", "end_time", "status", "purpose", "created_at", "updated_at")
+
+
+async def finalize_ended_bookings(db: AsyncSession, now: datetime, batch_size: int) -> List[int]:
+    """Passe à « terminée » les réservations confirmées dont la fin est passée, par lots."""
+    finalized = []
+    while True:
+        batch = (
+            select(Booking.id)
+            .where(is_active(), Booking.end_time <= now)
+            .order_by(Booking.id)
+            .limit(batch_size)
+        )
+        result = await db.execute(
+            update(Booking.__table__)
+            # is_active() répété : une annulation concurrente n'est pas écrasée
+            .where(Booking.id.in_(batch.scalar_subquery()), is_active())
+            .values(status="terminée", updated_at=now)
+            .returning(Booking.id)
+        )
+        ids = result.scalars().all()
+        await db.commit()
+        for booking_id in ids:
+            booking_index.remove(booking_id)
+        finalized.extend(ids)
+        if len(ids) < batch_size:
+            return finalized
+
+
+async def archive_bookings(db: AsyncSession, before: datetime, batch_size: int) -> int:
+    """Déplace vers bookings_history les réservations inactives terminées avant `before`."""
+    archived = 0
+    columns = [getattr(Booking, name) for name in ARCHIVED_COLUMNS]
+    while True:
+        result = await db.execute(
+            select(Booking.id)
+            .where(Booking.status != ACTIVE_BOOKING_STATUS, Booking.end_time < before)
+            .order_by(Booking.id)
+            .limit(batch_size)
+        )
+        ids = result.scalars().all()
+        if not ids:
+            return archived
+        # Les heures de conduite des réservations archivées doivent être comptées avant leur départ de la table
+        user_ids = await db.execute(select(Booking.user_id).where(Booking.id.in_(ids)).distinct())
+        now = datetime.utcnow()
+        for user_id in sorted(user_ids.scalars().all()):
+            await refresh_user_summary(db, user_id, now)
+        await db.execute(
+            insert(BookingHistory).from_select(ARCHIVED_COLUMNS, select(*columns).where(Booking.id.in_(ids)))
+        )
+        await db.execute(delete(Booking.__table__).where(Booking.id.in_(ids)))
+        await db.commit()
+        archived += len(ids)
+        if len(ids) < batch_size:
+            return archived
+
+
+@asynccontextmanager
+async def _single_runner_session():
+    """Session de la passe, ou None si un autre process (worker uvicorn, worker.py) la fait déjà.
+
+    Sur PostgreSQL, un verrou consultatif de session, pris sur une connexion dédiée
+    pour toute la passe, élit un seul exécutant. SQLite ne sert qu'en local : pas de verrou.
+    """
+    async with engine.connect() as conn:
+        guarded = conn.dialect.name == "postgresql"
+        if guarded:
+            acquired = await conn.scalar(select(func.pg_try_advisory_lock(ADVISORY_LOCK_NAMESPACE, LIFECYCLE_LOCK_ID)))
+            # Fin de la transaction ouverte par la requête : la session gère ensuite les siennes
+            await conn.commit()
+            if not acquired:
+                yield None
+                return
+        try:
+            async with SessionLocal(bind=conn) as db:
+                yield db
+        finally:
+            if guarded:
+                await conn.execute(select(func.pg_advisory_unlock(ADVISORY_LOCK_NAMESPACE, LIFECYCLE_LOCK_ID)))
+                await conn.commit()
+
+
+async def run_booking_lifecycle(now: Optional[datetime] = None) -> dict:
+    now = now or datetime.utcnow()
+    batch_size = settings.booking_lifecycle_batch_size
+    async with _single_runner_session() as db:
+        if db is None:
+            return {"finalized": 0, "archived": 0}
+        finalized = await finalize_ended_bookings(db, now, batch_size)
+        archived = await archive_bookings(db, now - timedelta(days=settings.booking_archive_after_days), batch_size)
+    return {"finalized": len(finalized), "archived": archived}
+
+
+async def booking_lifecycle_loop(interval_seconds: int):
+    """Tâche de fond : une passe toutes les `interval_seconds` secondes, jusqu'à annulation."""
+    while True:
+        try:
+            counts = await run_booking_lifecycle()
+            if counts["finalized"] or counts["archived"]:
+                logger.info(f"Cycle de vie des réservations : {counts['finalized']} terminées, {counts['archived']} archivées")
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.error(f"Cycle de vie des réservations en échec : {exc}")
+        await asyncio.sleep(interval_seconds)
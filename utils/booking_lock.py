@@ -0,0 +1,49 @@
+import asyncio
+from typing import Dict, List
+from contextlib import asynccontextmanager
+
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Nom de la contrainte d'exclusion (PostgreSQL) et des triggers équivalents (SQLite)
+OVERLAP_CONSTRAINT = "bookings_no_overlap"
+# Premier argument de pg_advisory_xact_lock(int, int), pour ne pas entrer en collision avec d'autres verrous
+ADVISORY_LOCK_NAMESPACE = 2026
+
+# car_id -> [verrou, nombre de requêtes qui le tiennent ou l'attendent] ; supprimé quand personne ne l'utilise
+_car_locks: Dict[int, List] = {}
+
+
+def reset_car_locks():
+    """Oublie les verrous existants (liés à la boucle asyncio qui les a créés)."""
+    _car_locks.clear()
+
+
+@asynccontextmanager
+async def car_lock(db: AsyncSession, car_id: int):
+    """Sérialise vérification + insertion pour une voiture, sans bloquer les autres voitures.
+
+    Dans un même process, un asyncio.Lock par voiture suffit. Sur PostgreSQL, un
+    verrou consultatif de transaction protège aussi entre workers ; il est libéré
+    au commit ou au rollback.
+    """
+    entry = _car_locks.setdefault(car_id, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            if db.get_bind().dialect.name == "postgresql":
+                await db.execute(select(func.pg_advisory_xact_lock(ADVISORY_LOCK_NAMESPACE, car_id)))
+            try:
+                yield
+            except BaseException:
+                await db.rollback()
+                raise
+    finally:
+        entry[1] -= 1
+        if not entry[1] and _car_locks.get(car_id) is entry:
+            del _car_locks[car_id]
+
+
+def is_overlap_violation(exc: IntegrityError) -> bool:
+    return OVERLAP_CONSTRAINT in str(exc.orig)
@@ -0,0 +1,106 @@
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config import settings
+
+
+class LRUCache:
+    """Cache en mémoire du process (par défaut), borné en taille, avec expiration."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # Compteurs (incr) hors LRU : un compteur évincé repartirait de 0 et rendrait
+        # à nouveau valides les pages mises en cache sous d'anciennes générations
+        self._counters: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self._entries[key] = (time.monotonic() + (ttl or self.ttl_seconds), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[int] = None):
+        for key, value in items.items():
+            await self.set(key, value, ttl)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self._entries.pop(key, None)
+            self._counters.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        value = self._counters.get(key, 0) + 1
+        self._counters[key] = value
+        return value
+
+    async def clear(self):
+        self._entries.clear()
+        self._counters.clear()
+
+
+class RedisCache:
+    """Cache partagé entre workers (dépendance optionnelle : `pip install redis`)."""
+
+    def __init__(self, url: str, namespace: str, ttl_seconds: int):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(self._key(key))
+
+    async def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        await self._client.set(self._key(key), value, ex=ttl or self.ttl_seconds)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys:
+            return []
+        return await self._client.mget([self._key(key) for key in keys])
+
+    async def set_many(self, items: Dict[str, bytes], ttl: Optional[int] = None):
+        async with self._client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self._key(key), value, ex=ttl or self.ttl_seconds)
+            await pipe.execute()
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self._client.delete(*(self._key(key) for key in keys))
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(self._key(key))
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match=self._key("*")):
+            await self._client.delete(key)
+
+
+def build_cache(namespace: str, max_entries: Optional[int] = None):
+    if settings.cache_backend == "redis":
+        return RedisCache(settings.cache_redis_url, namespace, settings.cache_ttl_seconds)
+    return LRUCache(max_entries or settings.cache_max_entries, settings.cache_ttl_seconds)
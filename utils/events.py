@@ -0,0 +1,101 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Optional, Set
+
+from config import settings
+from utils.logger import logger
+
+
+class InMemoryBroker:
+    """Diffusion des événements aux clients connectés à ce worker.
+
+    Une file bornée par abonné : un client trop lent perd ses événements les
+    plus anciens au lieu de ralentir la publication.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.dropped = 0
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    def dispatch(self, event: dict):
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    async def publish(self, event: dict):
+        self.dispatch(event)
+
+    @asynccontextmanager
+    async def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+
+class RedisBroker(InMemoryBroker):
+    """Diffusion entre workers via Redis pub/sub (dépendance optionnelle : `pip install redis`).
+
+    Les événements sont publiés sur Redis uniquement ; une tâche par worker,
+    lancée au premier abonné, les relaie aux clients locaux.
+    """
+
+    CHANNEL = "car2go:events"
+
+    def __init__(self, url: str, queue_size: int):
+        import redis.asyncio as redis
+
+        super().__init__(queue_size)
+        self._client = redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, event: dict):
+        await self._client.publish(self.CHANNEL, json.dumps(event, default=str))
+
+    async def _listen(self):
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self.CHANNEL)
+        async for message in pubsub.listen():
+            if message["type"] == "message":
+                self.dispatch(json.loads(message["data"]))
+
+    @asynccontextmanager
+    async def subscribe(self):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        async with super().subscribe() as queue:
+            yield queue
+
+
+def build_broker():
+    if settings.events_backend == "redis":
+        return RedisBroker(settings.events_redis_url or settings.cache_redis_url, settings.events_queue_size)
+    return InMemoryBroker(settings.events_queue_size)
+
+
+event_broker = build_broker()
+
+
+async def publish_event(event_type: str, data: dict, user_id: Optional[int] = None):
+    """Publie un événement ; avec `user_id`, seul cet utilisateur le reçoit.
+
+    Un échec du broker ne doit pas faire échouer la mutation déjà validée.
+    """
+    event = {"type": event_type, "data": data, "time": datetime.utcnow().isoformat()}
+    if user_id is not None:
+        event["user_id"] = user_id
+    try:
+        await event_broker.publish(event)
+    except Exception as exc:
+        logger.error(f"Publication de l'événement {event_type} impossible : {exc}")
@@ -0,0 +1,102 @@
+import asyncio
+import hashlib
+import json
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, Type
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from config import settings
+from utils.cache import build_cache
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+# Réponses déjà rendues, par (utilisateur, route, clé) : LRU du process ou Redis partagé
+idempotency_store = build_cache("idempotency", settings.idempotency_max_entries)
+
+# Requêtes en cours par clé : un second envoi attend la fin du premier puis rejoue sa réponse
+_in_flight: Dict[str, list] = {}
+
+
+@asynccontextmanager
+async def _key_lock(store_key: str):
+    entry = _in_flight.setdefault(store_key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _in_flight[store_key]
+
+
+def _fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True).encode()).hexdigest()
+
+
+def _render(response_model: Type[BaseModel], result: Any) -> Any:
+    # Même sérialisation que FastAPI avec response_model, pour que le rejeu soit identique
+    if isinstance(result, BaseModel):
+        return jsonable_encoder(result)
+    if isinstance(result, dict):
+        return jsonable_encoder(response_model.parse_obj(result))
+    return jsonable_encoder(response_model.from_orm(result))
+
+
+def _replay(entry: bytes, fingerprint: str) -> JSONResponse:
+    stored = json.loads(entry)
+    if stored["fingerprint"] != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key déjà utilisée pour une autre requête")
+    return JSONResponse(stored["body"], status_code=stored["status"], headers={IDEMPOTENT_REPLAY_HEADER: "true"})
+
+
+async def run_idempotent(
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Awaitable[Any]],
+    response_model: Type[BaseModel],
+    ttl_seconds: Optional[int] = None,
+):
+    """Exécute `handler` une seule fois par clé `Idempotency-Key` et portée (utilisateur + route).
+
+    Les renvois de la même requête reçoivent la réponse enregistrée, erreurs 4xx
+    comprises, sans refaire les contrôles, le hachage ni les insertions. Une clé
+    réutilisée avec un autre corps est refusée (422). Les erreurs 5xx ne sont pas
+    enregistrées : le client peut réessayer. Sans clé, `handler` est appelé tel quel.
+    `ttl_seconds` raccourcit la conservation (par défaut idempotency_ttl_seconds),
+    pour une réponse qui se périme plus tôt, comme un jeton d'accès.
+    """
+    if key is None:
+        return await handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"Idempotency-Key doit faire entre 1 et {MAX_KEY_LENGTH} caractères")
+
+    store_key = f"{scope}:{key}"
+    fingerprint = _fingerprint(payload)
+    async with _key_lock(store_key):
+        stored = await idempotency_store.get(store_key)
+        if stored is not None:
+            return _replay(stored, fingerprint)
+
+        try:
+            result = await handler()
+        except HTTPException as exc:
+            if exc.status_code < 500:
+                await _remember(store_key, fingerprint, exc.status_code, {"detail": exc.detail}, ttl_seconds)
+            raise
+        body = _render(response_model, result)
+        await _remember(store_key, fingerprint, 200, body, ttl_seconds)
+        return JSONResponse(body)
+
+
+async def _remember(store_key: str, fingerprint: str, status: int, body: Any, ttl_seconds: Optional[int] = None):
+    entry = json.dumps({"fingerprint": fingerprint, "status": status, "body": body}).encode()
+    ttl = settings.idempotency_ttl_seconds if ttl_seconds is None else min(ttl_seconds, settings.idempotency_ttl_seconds)
+    await idempotency_store.set(store_key, entry, ttl)
@@ -1,20 +1,132 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
 import os
+import queue
+import random
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
 
-LOG_DIR = "logs"
-if not os.path.exists(LOG_DIR):
-    os.makedirs(LOG_DIR)
-
-# Configuration du logger
-LOG_FILE = os.path.join(LOG_DIR, "app.log")
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        RotatingFileHandler(LOG_FILE, maxBytes=5_000_000, backupCount=3),
-        logging.StreamHandler()  # Pour afficher aussi les logs dans la console
-    ],
-)
-
-logger = logging.getLogger("car2go")
\ No newline at end of file
+from config import settings
+
+LOG_FILE_NAME = "app.log"
+# Champs structurés ajoutés via `extra=` et recopiés tels quels dans le JSON
+STRUCTURED_FIELDS = ("request_id", "user_id", "method", "route", "status", "latency_ms", "db_queries", "db_ms")
+
+
+class RequestContext:
+    """Contexte de la requête HTTP en cours, partagé entre le middleware et les dépendances."""
+
+    __slots__ = ("request_id", "user_id")
+
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.user_id: Optional[int] = None
+
+
+request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+class RequestContextFilter(logging.Filter):
+    # Exécuté dans le thread appelant (avant la file) : le contextvar y est encore visible
+    def filter(self, record):
+        context = request_context.get()
+        if context is not None:
+            if not hasattr(record, "request_id"):
+                record.request_id = context.request_id
+            if not hasattr(record, "user_id") and context.user_id is not None:
+                record.user_id = context.user_id
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in STRUCTURED_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                payload[field] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SizeAndTimeRotatingFileHandler(RotatingFileHandler):
+    """Rotation dès que le fichier dépasse `maxBytes` ou qu'il est plus vieux que `interval` secondes."""
+
+    def __init__(self, filename, maxBytes, backupCount, interval):
+        # delay=True : ni dossier ni fichier tant qu'aucun log n'est écrit
+        super().__init__(filename, maxBytes=maxBytes, backupCount=backupCount, encoding="utf-8", delay=True)
+        self.interval = interval
+        self.rollover_at = time.time() + interval
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        return super()._open()
+
+    def shouldRollover(self, record):
+        if time.time() >= self.rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+
+_listener: Optional[QueueListener] = None
+
+
+def configure_logging():
+    """Installe la file de logs : les appels dans la boucle asyncio ne font qu'un `put`,
+    l'écriture (fichier, console, rotation) se fait dans le thread du QueueListener."""
+    global _listener
+    if _listener is not None:
+        return
+
+    file_handler = SizeAndTimeRotatingFileHandler(
+        os.path.join(settings.log_dir, LOG_FILE_NAME),
+        maxBytes=settings.log_max_bytes,
+        backupCount=settings.log_backup_count,
+        interval=settings.log_rotate_interval_seconds,
+    )
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()  # Pour afficher aussi les logs dans la console
+    console_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(settings.log_level)
+
+    _listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Vide la file et arrête le thread d'écriture."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def should_log_request(status_code: int) -> bool:
+    # Les erreurs sont toujours journalisées, les succès échantillonnés
+    return status_code >= 400 or random.random() < settings.log_success_sample_rate
+
+
+configure_logging()
+logger = logging.getLogger("car2go")
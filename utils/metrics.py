@@ -0,0 +1,124 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Bornes (en secondes) des histogrammes de latence
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class RequestDBStats:
+    __slots__ = ("queries", "seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+
+# Statistiques SQL de la requête HTTP en cours (None hors requête : démarrage, tâches de fond)
+current_db_stats: ContextVar[Optional[RequestDBStats]] = ContextVar("current_db_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append((context, time.perf_counter()))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _record_query(conn)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # Requête en échec (ex. conflit d'une réservation) : after_cursor_execute n'est pas appelé,
+    # son départ doit quand même être dépilé sous peine de décaler toutes les mesures suivantes.
+    # L'erreur peut aussi survenir avant l'envoi de la requête : rien n'a alors été empilé.
+    conn = exception_context.connection
+    started = conn.info.get("query_start") if conn is not None else None
+    if started and started[-1][0] is exception_context.execution_context:
+        _record_query(conn)
+
+
+def _record_query(conn):
+    _, started_at = conn.info["query_start"].pop()
+    elapsed = time.perf_counter() - started_at
+    stats = current_db_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += elapsed
+
+
+def _labels(**labels) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels.items())
+
+
+class MetricsRegistry:
+    """Métriques par route (gabarit de chemin, pas l'URL brute) au format texte Prometheus."""
+
+    def __init__(self):
+        self.request_duration: Dict[Tuple[str, str, str], Histogram] = {}
+        self.db_duration: Dict[Tuple[str, str], Histogram] = {}
+        self.db_queries: Dict[Tuple[str, str], int] = {}
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float, db_stats: RequestDBStats):
+        status_class = f"{status_code // 100}xx"
+        key = (method, route, status_class)
+        self.request_duration.setdefault(key, Histogram()).observe(seconds)
+        self.db_duration.setdefault((method, route), Histogram()).observe(db_stats.seconds)
+        self.db_queries[(method, route)] = self.db_queries.get((method, route), 0) + db_stats.queries
+
+    def render(self, extra_gauges: Optional[Dict[str, float]] = None) -> str:
+        lines = []
+        self._render_histograms(
+            lines,
+            "http_request_duration_seconds",
+            "Durée des requêtes HTTP par route",
+            {_labels(method=m, route=r, status=s): h for (m, r, s), h in self.request_duration.items()},
+        )
+        self._render_histograms(
+            lines,
+            "http_request_db_duration_seconds",
+            "Temps passé en base par requête HTTP",
+            {_labels(method=m, route=r): h for (m, r), h in self.db_duration.items()},
+        )
+        lines.append("# HELP http_request_db_queries_total Requêtes SQL exécutées par route")
+        lines.append("# TYPE http_request_db_queries_total counter")
+        for (method, route), total in sorted(self.db_queries.items()):
+            lines.append(f"http_request_db_queries_total{{{_labels(method=method, route=route)}}} {total}")
+        for name, value in (extra_gauges or {}).items():
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines, name, help_text, histograms):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+metrics = MetricsRegistry()
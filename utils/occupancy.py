@@ -0,0 +1,138 @@
+from array import array
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from config import settings
+from models.booking import Booking
+from utils.booking_index import _naive_utc
+from utils.cache import build_cache
+
+# Pas du planning, en minutes
+GRANULARITIES = {"5m": 5, "15m": 15, "30m": 30, "1h": 60}
+MINUTES_PER_DAY = 24 * 60
+MAX_OCCUPANCY_DAYS = 62
+
+# (début, fin) en minutes depuis minuit, fusionnés et triés
+DayIntervals = List[Tuple[int, int]]
+BucketKey = Tuple[int, date]
+
+# Une entrée par (voiture, jour), indépendante du pas : invalidée par les mutations de réservations
+occupancy_cache = build_cache("occupancy", settings.occupancy_cache_max_entries)
+
+
+def _bucket_key(car_id: int, day: date) -> str:
+    return f"{car_id}:{day.isoformat()}"
+
+
+def _encode(intervals: DayIntervals) -> bytes:
+    # Bornes en minutes (≤ 1440) : deux octets chacune, décodées sans analyse de texte
+    return array("H", [bound for interval in intervals for bound in interval]).tobytes()
+
+
+def _decode(value: bytes) -> DayIntervals:
+    bounds = array("H")
+    bounds.frombytes(value)
+    return list(zip(bounds[::2], bounds[1::2]))
+
+
+def _days(first_day: date, last_day: date) -> List[date]:
+    return [first_day + timedelta(days=offset) for offset in range((last_day - first_day).days)]
+
+
+def split_by_day(rows: Iterable[Tuple[int, datetime, datetime]]) -> Dict[BucketKey, DayIntervals]:
+    """Découpe des réservations (car_id, début, fin) triées par début en minutes par jour, fusionnées."""
+    buckets: Dict[BucketKey, DayIntervals] = defaultdict(list)
+    for car_id, start_time, end_time in rows:
+        start_time, end_time = _naive_utc(start_time), _naive_utc(end_time)
+        day = start_time.date()
+        while datetime.combine(day, time()) < end_time:
+            midnight = datetime.combine(day, time())
+            start = max(0, int((start_time - midnight).total_seconds() // 60))
+            end = min(MINUTES_PER_DAY, -int(-(end_time - midnight).total_seconds() // 60))
+            intervals = buckets[(car_id, day)]
+            # Créneaux contigus ou chevauchants : un seul intervalle
+            if intervals and start <= intervals[-1][1]:
+                intervals[-1] = (intervals[-1][0], max(intervals[-1][1], end))
+            else:
+                intervals.append((start, end))
+            day += timedelta(days=1)
+    return buckets
+
+
+async def load_occupancy(
+    db: AsyncSession, car_ids: List[int], first_day: date, last_day: date
+) -> Dict[BucketKey, DayIntervals]:
+    """Intervalles occupés de chaque (voiture, jour) de [first_day, last_day), depuis le cache ou la base.
+
+    Les jours absents du cache sont recalculés par une seule requête sur le plus
+    petit rectangle (voitures × jours) qui les contient.
+    """
+    days = _days(first_day, last_day)
+    buckets = [(car_id, day) for car_id in car_ids for day in days]
+    cached = await occupancy_cache.get_many([_bucket_key(*bucket) for bucket in buckets])
+
+    occupancy: Dict[BucketKey, DayIntervals] = {}
+    missing = []
+    for bucket, value in zip(buckets, cached):
+        if value is None:
+            missing.append(bucket)
+        else:
+            occupancy[bucket] = _decode(value)
+    if not missing:
+        return occupancy
+
+    missing_cars = sorted({car_id for car_id, _ in missing})
+    window_start = datetime.combine(min(day for _, day in missing), time())
+    window_end = datetime.combine(max(day for _, day in missing) + timedelta(days=1), time())
+    stmt = (
+        select(Booking.car_id, Booking.start_time, Booking.end_time)
+        # Les réservations terminées restent visibles sur le planning, pas les annulées
+        .where(Booking.status != "annulée", Booking.end_time > window_start, Booking.start_time < window_end)
+        .order_by(Booking.car_id, Booking.start_time)
+    )
+    if len(missing_cars) < len(car_ids):
+        stmt = stmt.where(Booking.car_id.in_(missing_cars))
+    computed = split_by_day((await db.execute(stmt)).all())
+
+    fresh = {}
+    for bucket in missing:
+        occupancy[bucket] = computed.get(bucket, [])
+        fresh[_bucket_key(*bucket)] = _encode(occupancy[bucket])
+    await occupancy_cache.set_many(fresh)
+    return occupancy
+
+
+async def invalidate_occupancy(car_id: int, start_time: datetime, end_time: datetime):
+    start_time, end_time = _naive_utc(start_time), _naive_utc(end_time)
+    # Jours touchés par [start_time, end_time) : une fin à minuit n'invalide pas le jour suivant
+    last_day = max(end_time - timedelta(microseconds=1), start_time).date() + timedelta(days=1)
+    await occupancy_cache.delete(*(_bucket_key(car_id, day) for day in _days(start_time.date(), last_day)))
+
+
+def to_bitmap(intervals: DayIntervals, step: int) -> int:
+    """Créneaux occupés du jour sous forme d'entier : bit i = créneau [i*step, (i+1)*step)."""
+    bitmap = 0
+    for start, end in intervals:
+        first, last = start // step, -(-end // step)
+        bitmap |= ((1 << (last - first)) - 1) << first
+    return bitmap
+
+
+def to_runs(day_intervals: List[DayIntervals], step: int) -> List[Tuple[int, int]]:
+    """Plages [début, fin) de créneaux occupés, numérotés depuis le premier jour, fusionnées d'un jour à l'autre."""
+    slots_per_day = MINUTES_PER_DAY // step
+    runs: List[Tuple[int, int]] = []
+    for offset, intervals in enumerate(day_intervals):
+        base = offset * slots_per_day
+        for start, end in intervals:
+            first, last = base + start // step, base + -(-end // step)
+            if runs and first <= runs[-1][1]:
+                runs[-1] = (runs[-1][0], max(runs[-1][1], last))
+            else:
+                runs.append((first, last))
+    return runs
+
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from fastapi import Response
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def paginate(stmt, id_column, limit: int, after: Optional[int]):
+    """Pagination par curseur (keyset) sur une clé croissante, sans OFFSET.
+
+    On lit un élément de plus que demandé pour savoir s'il existe une page suivante.
+    """
+    if after is not None:
+        stmt = stmt.where(id_column > after)
+    return stmt.order_by(id_column).limit(limit + 1)
+
+
+def page_items(rows, limit: int, response: Response):
+    """Tronque le résultat de `paginate` et renseigne l'en-tête du curseur suivant."""
+    items = rows[:limit]
+    if len(rows) > limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(items[-1].id)
+    return items
@@ -0,0 +1,55 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from fastapi import HTTPException
+
+from config import settings
+
+
+@lru_cache(maxsize=None)
+def get_password_context():
+    """Contexte bcrypt unique du process, créé au premier hachage (passlib est lent à importer)."""
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+class PasswordHasher:
+    """Exécute bcrypt (~250 ms par appel) hors de la boucle asyncio.
+
+    bcrypt libère le GIL : un pool de threads borné suffit à paralléliser les calculs.
+    Au-delà de `max_pending` opérations en cours ou en attente, on refuse avec un 503
+    plutôt que de laisser la file grossir pendant une rafale de connexions.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        # Les threads ne sont créés qu'au premier appel
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password")
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+
+    async def _run(self, func, *args):
+        # Compteur manipulé uniquement depuis la boucle asyncio : pas besoin de verrou
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Service surchargé, veuillez réessayer",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_context().hash, password)
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await self._run(get_password_context().verify, password, hashed_password)
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_max_pending)
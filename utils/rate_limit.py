@@ -0,0 +1,202 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+
+from config import settings
+from utils.auth import verify_token
+
+# Classes de routes : chacune a son propre seau de jetons par client
+AUTH = "auth"
+EXPENSIVE = "expensive"
+WRITE = "write"
+READ = "read"
+
+# Routes non limitées : supervision et flux d'événements (connexion longue)
+EXEMPT_PATHS = ("/metrics", "/events")
+
+# Lectures coûteuses : listes complètes, exports, agrégats (préfixes de chemin, GET seulement)
+EXPENSIVE_PATHS = ("/bookings/export", "/cars/occupancy", "/analytics/")
+
+
+def route_class(method: str, path: str) -> Optional[str]:
+    """Classe de limitation d'une requête, d'après la méthode et le chemin brut (avant routage)."""
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    if method == "POST" and path in ("/auth/login", "/auth/register"):
+        return AUTH
+    if method == "POST" and path == "/cars/bulk":
+        return EXPENSIVE
+    if method != "GET":
+        return WRITE
+    if path in ("/bookings", "/bookings/") or path.startswith(EXPENSIVE_PATHS):
+        return EXPENSIVE
+    return READ
+
+
+class RateLimitPolicy(NamedTuple):
+    per_minute: int
+    burst: int
+
+
+class InMemoryBucketStore:
+    """Seaux de jetons du process, bornés en nombre (les clients inactifs sont oubliés en premier)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, policy: RateLimitPolicy, now: float) -> float:
+        """Consomme un jeton ; retourne 0 si accepté, sinon le délai (s) avant le prochain jeton."""
+        rate = policy.per_minute / 60
+        tokens, updated_at = self._buckets.get(key, (policy.burst, now))
+        tokens = min(policy.burst, tokens + (now - updated_at) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_entries:
+            self._buckets.popitem(last=False)
+        return wait
+
+    async def clear(self):
+        self._buckets.clear()
+
+
+class RedisBucketStore:
+    """Seaux partagés entre workers (dépendance optionnelle : `pip install redis`)."""
+
+    # Lecture, recharge et consommation atomiques côté Redis
+    SCRIPT = """
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local tokens = tonumber(bucket[1]) or burst
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    async def take(self, key: str, policy: RateLimitPolicy, now: float) -> float:
+        wait = await self._script(keys=[f"ratelimit:{key}"], args=[policy.per_minute / 60, policy.burst, now])
+        return float(wait)
+
+    async def clear(self):
+        async for key in self._client.scan_iter(match="ratelimit:*"):
+            await self._client.delete(key)
+
+
+class RateLimiter:
+    """Limitation par client (utilisateur ou IP) et par classe de route, plus un plafond de
+    requêtes coûteuses simultanées par worker.
+
+    Au-delà du débit : 429 ; au-delà du plafond de concurrence : 503. Les deux avec Retry-After.
+    """
+
+    def __init__(self, store, policies: Dict[str, RateLimitPolicy], max_expensive_in_flight: int, enabled: bool = True):
+        self.store = store
+        self.policies = policies
+        self.max_expensive_in_flight = max_expensive_in_flight
+        self.enabled = enabled
+        self.expensive_in_flight = 0
+        self.allowed: Dict[str, int] = {name: 0 for name in policies}
+        self.limited: Dict[str, int] = {name: 0 for name in policies}
+        self.shed = 0
+
+    async def check(self, client_key: str, route_class: str) -> Optional[Tuple[int, int]]:
+        """Retourne (statut, Retry-After) si la requête doit être refusée, sinon None."""
+        wait = await self.store.take(f"{route_class}:{client_key}", self.policies[route_class], time.time())
+        if wait > 0:
+            self.limited[route_class] += 1
+            return 429, math.ceil(wait)
+        if route_class == EXPENSIVE and self.expensive_in_flight >= self.max_expensive_in_flight:
+            self.shed += 1
+            return 503, 1
+        self.allowed[route_class] += 1
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        stats = {"expensive_in_flight": self.expensive_in_flight, "shed_total": self.shed}
+        for name in self.policies:
+            stats[f"{name}_allowed_total"] = self.allowed[name]
+            stats[f"{name}_limited_total"] = self.limited[name]
+        return stats
+
+
+def client_key(request: Request) -> str:
+    # Utilisateur du jeton s'il est valide (signature seulement, sans requête SQL), sinon adresse IP
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = verify_token(authorization[7:])
+        if payload is not None and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+class RateLimitMiddleware:
+    """Middleware ASGI de `rate_limiter`.
+
+    ASGI brut plutôt que @app.middleware("http") : l'appel à l'application ne rend
+    la main qu'une fois le corps entièrement envoyé, si bien qu'une réponse en flux
+    (/bookings/export) garde sa place dans le plafond de concurrence jusqu'au bout.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not rate_limiter.enabled:
+            await self.app(scope, receive, send)
+            return
+        request = Request(scope)
+        request_class = route_class(request.method, request.url.path)
+        if request_class is None:
+            await self.app(scope, receive, send)
+            return
+        rejection = await rate_limiter.check(client_key(request), request_class)
+        if rejection is not None:
+            status_code, retry_after = rejection
+            detail = "Trop de requêtes, réessayez plus tard" if status_code == 429 else "Service surchargé, réessayez plus tard"
+            response = JSONResponse(status_code=status_code, content={"detail": detail}, headers={"Retry-After": str(retry_after)})
+            await response(scope, receive, send)
+            return
+        if request_class != EXPENSIVE:
+            await self.app(scope, receive, send)
+            return
+        rate_limiter.expensive_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            rate_limiter.expensive_in_flight -= 1
+
+
+def build_rate_limiter() -> RateLimiter:
+    if settings.rate_limit_backend == "redis":
+        store = RedisBucketStore(settings.rate_limit_redis_url or settings.cache_redis_url)
+    else:
+        store = InMemoryBucketStore(settings.rate_limit_max_clients)
+    policies = {
+        AUTH: RateLimitPolicy(settings.rate_limit_auth_per_minute, settings.rate_limit_auth_burst),
+        EXPENSIVE: RateLimitPolicy(settings.rate_limit_expensive_per_minute, settings.rate_limit_expensive_burst),
+        WRITE: RateLimitPolicy(settings.rate_limit_write_per_minute, settings.rate_limit_write_burst),
+        READ: RateLimitPolicy(settings.rate_limit_read_per_minute, settings.rate_limit_read_burst),
+    }
+    return RateLimiter(store, policies, settings.rate_limit_expensive_max_in_flight, settings.rate_limit_enabled)
+
+
+rate_limiter = build_rate_limiter()
@@ -0,0 +1,77 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Tuple
+
+from sqlalchemy import delete, tuple_
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.analytics import BookingDailyRollup
+from utils.booking_index import _naive_utc
+
+# (car_id, user_id, start_time, end_time, status)
+BookingFacts = Tuple[int, int, datetime, datetime, str]
+
+
+def booking_facts(booking) -> BookingFacts:
+    return (booking.car_id, booking.user_id, booking.start_time, booking.end_time, booking.status)
+
+
+def minutes_by_day(start_time: datetime, end_time: datetime) -> List[Tuple[date, int]]:
+    """Minutes de [start_time, end_time) réparties par jour UTC ; aucune pour un créneau vide ou inversé."""
+    start_time, end_time = _naive_utc(start_time), _naive_utc(end_time)
+    days = []
+    if end_time <= start_time:
+        # Sinon des minutes négatives (et une réservation sans durée) entreraient dans les cumuls
+        return days
+    day = start_time.date()
+    while datetime.combine(day, time()) < end_time:
+        next_midnight = datetime.combine(day + timedelta(days=1), time())
+        minutes = int((min(end_time, next_midnight) - max(start_time, datetime.combine(day, time()))).total_seconds() // 60)
+        days.append((day, minutes))
+        day += timedelta(days=1)
+    return days
+
+
+async def apply_rollup_delta(db: AsyncSession, removed: Iterable[BookingFacts] = (), added: Iterable[BookingFacts] = ()):
+    """Retire `removed` et ajoute `added` aux cumuls journaliers, dans la transaction en cours.
+
+    À appeler avant le commit de la mutation : réservations et cumuls sont validés ensemble.
+    """
+    deltas = defaultdict(lambda: [0, 0])
+    for facts, sign in [(facts, -1) for facts in removed] + [(facts, 1) for facts in added]:
+        car_id, user_id, start_time, end_time, status = facts
+        if status == "annulée":
+            continue
+        for position, (day, minutes) in enumerate(minutes_by_day(start_time, end_time)):
+            delta = deltas[(day, car_id, user_id)]
+            delta[0] += sign * minutes
+            if position == 0:
+                delta[1] += sign
+
+    rows = [
+        {"day": day, "car_id": car_id, "user_id": user_id, "booked_minutes": minutes, "bookings": count}
+        for (day, car_id, user_id), (minutes, count) in deltas.items()
+        if minutes or count
+    ]
+    if not rows:
+        return
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    stmt = insert(BookingDailyRollup).values(rows)
+    table = BookingDailyRollup.__table__
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=["day", "car_id", "user_id"],
+        set_={
+            "booked_minutes": table.c.booked_minutes + stmt.excluded.booked_minutes,
+            "bookings": table.c.bookings + stmt.excluded.bookings,
+        },
+    ))
+    # Jours vidés par une suppression ou une annulation : la ligne disparaît
+    emptied = [(row["day"], row["car_id"], row["user_id"]) for row in rows if row["booked_minutes"] < 0]
+    if emptied:
+        await db.execute(delete(BookingDailyRollup).where(
+            tuple_(BookingDailyRollup.day, BookingDailyRollup.car_id, BookingDailyRollup.user_id).in_(emptied),
+            BookingDailyRollup.booked_minutes == 0,
+            BookingDailyRollup.bookings == 0,
+        ))
@@ -0,0 +1,90 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Set
+
+from config import settings
+
+
+class TokenCache:
+    """Cache LRU + TTL des utilisateurs authentifiés, indexé par `jti` (ou jeton brut).
+
+    Évite une requête `SELECT users` à chaque appel authentifié. Les entrées d'un
+    utilisateur sont invalidées quand il est modifié ou supprimé.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                self._discard(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user
+
+    def set(self, key: str, user: dict, token_exp: Optional[float] = None):
+        ttl = self.ttl_seconds
+        if token_exp is not None:
+            # Jamais au-delà de l'expiration du jeton lui-même
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, user)
+            self._keys_by_user.setdefault(user["id"], set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: int):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._discard(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        keys = self._keys_by_user.get(entry[1]["id"])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[entry[1]["id"]]
+
+
+token_cache = TokenCache(settings.token_cache_max_entries, settings.token_cache_ttl_seconds)
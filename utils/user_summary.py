@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from models.booking import Booking, BookingHistory, is_active
+from models.user import UserBookingSummary
+from utils.booking_index import _naive_utc
+from utils.rollups import BookingFacts
+
+
+def _minutes(start_time: datetime, end_time: datetime) -> int:
+    return int((_naive_utc(end_time) - _naive_utc(start_time)).total_seconds() // 60)
+
+
+async def _lock_summary(db: AsyncSession, user_id: int) -> UserBookingSummary:
+    # Crée la ligne si besoin puis la verrouille : deux mutations d'un même utilisateur se sérialisent
+    insert = postgresql_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+    await db.execute(
+        insert(UserBookingSummary)
+        .values(user_id=user_id, driven_minutes=0, upcoming_count=0)
+        .on_conflict_do_nothing(index_elements=["user_id"])
+    )
+    result = await db.execute(
+        select(UserBookingSummary)
+        .where(UserBookingSummary.user_id == user_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def _ended_minutes(db: AsyncSession, user_id: int, after: Optional[datetime], until: datetime) -> int:
+    """Minutes des réservations non annulées terminées dans (after, until] ; historique compris si after est None."""
+    tables = [Booking] if after is not None else [Booking, BookingHistory]
+    total = 0
+    for table in tables:
+        stmt = select(table.start_time, table.end_time).where(
+            table.user_id == user_id,
+            table.status != "annulée",
+            table.end_time <= until,
+        )
+        if after is not None:
+            stmt = stmt.where(table.end_time > after)
+        result = await db.execute(stmt)
+        total += sum(_minutes(start_time, end_time) for start_time, end_time in result.all())
+    return total
+
+
+async def refresh_user_summary(
+    db: AsyncSession,
+    user_id: int,
+    now: Optional[datetime] = None,
+    removed: Iterable[BookingFacts] = (),
+    added: Iterable[BookingFacts] = (),
+) -> UserBookingSummary:
+    """Met à jour le résumé de `user_id` dans la transaction en cours (avant le commit).
+
+    `removed` / `added` décrivent la réservation modifiée avant et après la
+    mutation : seules comptent celles déjà terminées avant le dernier calcul.
+    """
+    now = now or datetime.utcnow()
+    summary = await _lock_summary(db, user_id)
+    if summary.settled_at is None:
+        summary.driven_minutes = await _ended_minutes(db, user_id, None, now)
+    else:
+        settled_at = summary.settled_at
+        for facts, sign in [(facts, -1) for facts in removed] + [(facts, 1) for facts in added]:
+            _, _, start_time, end_time, status = facts
+            if status != "annulée" and _naive_utc(end_time) <= settled_at:
+                summary.driven_minutes += sign * _minutes(start_time, end_time)
+        summary.driven_minutes += await _ended_minutes(db, user_id, settled_at, now)
+    summary.settled_at = now
+
+    # Réservations actives pas encore terminées (en cours ou à venir), servies par ix_bookings_user_start
+    result = await db.execute(
+        select(Booking.id, Booking.car_id, Booking.start_time, Booking.end_time)
+        .where(Booking.user_id == user_id, is_active(), Booking.end_time > now)
+        .order_by(Booking.start_time)
+    )
+    upcoming = result.all()
+    summary.upcoming_count = len(upcoming)
+    next_booking = upcoming[0] if upcoming else None
+    summary.next_booking_id = next_booking.id if next_booking else None
+    summary.next_car_id = next_booking.car_id if next_booking else None
+    summary.next_start_time = next_booking.start_time if next_booking else None
+    summary.next_end_time = next_booking.end_time if next_booking else None
+    summary.refresh_at = min((row.end_time for row in upcoming), default=None)
+    return summary
+
+
+async def get_user_summary(db: AsyncSession, user_id: int) -> UserBookingSummary:
+    """Lecture d'une ligne ; recalcul (puis commit) seulement si elle est absente ou périmée."""
+    now = datetime.utcnow()
+    summary = await db.get(UserBookingSummary, user_id)
+    if summary is None or summary.settled_at is None or (summary.refresh_at is not None and summary.refresh_at <= now):
+        summary = await refresh_user_summary(db, user_id, now)
+        await db.commit()
+    return summary
@@ -0,0 +1,28 @@
+"""Worker du cycle de vie des réservations, à lancer à part de l'API.
+
+    python worker.py          # boucle (BOOKING_LIFECYCLE_INTERVAL_SECONDS)
+    python worker.py --once   # une seule passe (cron)
+
+Mettre alors BOOKING_LIFECYCLE_IN_APP=false côté API pour ne pas dupliquer la tâche
+(sur PostgreSQL, un verrou consultatif garantit de toute façon une seule passe à la fois).
+"""
+import argparse
+import asyncio
+
+from config import settings
+from utils.booking_lifecycle import booking_lifecycle_loop, run_booking_lifecycle
+from utils.logger import logger
+
+
+async def main(once: bool):
+    if once:
+        counts = await run_booking_lifecycle()
+        logger.info(f"Cycle de vie des réservations : {counts['finalized']} terminées, {counts['archived']} archivées")
+    else:
+        await booking_lifecycle_loop(settings.booking_lifecycle_interval_seconds)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--once", action="store_true")
+    asyncio.run(main(parser.parse_args().once))